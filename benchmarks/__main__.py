@@ -0,0 +1,138 @@
+"""
+Benchmarks for integrals.py.
+
+    python -m benchmarks                      # n up to 10^6
+    python -m benchmarks --max-exp 8          # n up to 10^8
+    python -m benchmarks -k runge             # only cases matching 'runge'
+    python -m benchmarks --compare benchmarks/results/abc1234.json
+
+Every case records the best wall time of several repeats, peak traced
+memory and the number of points the integrand was evaluated at.
+Results are saved as JSON (benchmarks/results/<commit>.json by default);
+with --compare, cases slower or heavier than the old file by more than
+--threshold are reported and the exit code is 1.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+import integrals
+from benchmarks.cases import FUNCTIONS, make_cases
+
+RESULTS_DIR = Path(__file__).parent / 'results'
+
+class CountingFunction:
+	"""Wraps an integrand and counts the points it was evaluated at."""
+	def __init__(self, func):
+		self.func = func
+		self.evaluations = 0
+
+	def __call__(self, x_arr):
+		self.evaluations += np.size(x_arr)
+		return self.func(x_arr)
+
+def measure(func_name, run, repeat):
+	func, a, b = FUNCTIONS[func_name]
+
+	# Кэш результатов сбрасываем перед каждым запуском, иначе повторы
+	# ничего не будут считать
+	times = []
+	for _ in range(repeat):
+		integrals.results_cache.clear()
+		counting = CountingFunction(func)
+		start = time.perf_counter()
+		run(counting, a, b)
+		times.append(time.perf_counter() - start)
+
+	integrals.results_cache.clear()
+	tracemalloc.start()
+	run(func, a, b)
+	_, peak_memory = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	integrals.results_cache.clear()
+
+	return {
+		'time': min(times),
+		'peak_memory': peak_memory,
+		'evaluations': counting.evaluations,
+	}
+
+def current_commit():
+	try:
+		return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+		                      capture_output=True, text=True,
+		                      check=True).stdout.strip()
+	except (OSError, subprocess.CalledProcessError):
+		return 'unknown'
+
+def compare(old, new, threshold):
+	"""Returns lines describing cases that got worse than in `old`."""
+	regressions = []
+	for case_id, result in new.items():
+		if case_id not in old:
+			continue
+		before = old[case_id]
+		for key in ('time', 'peak_memory', 'evaluations'):
+			if before[key] and result[key] > before[key] * (1 + threshold):
+				regressions.append(
+					f'{case_id}: {key} {before[key]:.4g} -> {result[key]:.4g} '
+					f'(x{result[key] / before[key]:.2f})'
+				)
+	return regressions
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog='python -m benchmarks')
+	parser.add_argument('--max-exp', type=int, default=6,
+	                    help='largest n is 10^MAX_EXP (default 6, up to 8)')
+	parser.add_argument('--repeat', type=int, default=3)
+	parser.add_argument('-k', '--filter', default='',
+	                    help='run only cases whose id contains this text')
+	parser.add_argument('-o', '--output',
+	                    help='JSON file for results')
+	parser.add_argument('--compare',
+	                    help='JSON file of an earlier run to compare against')
+	parser.add_argument('--threshold', type=float, default=0.2,
+	                    help='allowed relative slowdown (default 0.2)')
+	args = parser.parse_args(argv)
+
+	commit = current_commit()
+	results = {}
+	for case_id, (func_name, run) in make_cases(args.max_exp).items():
+		if args.filter not in case_id:
+			continue
+		results[case_id] = measure(func_name, run, args.repeat)
+		r = results[case_id]
+		print(f'{case_id:<50}{r["time"] * 1000:>10.2f} ms'
+		      f'{r["peak_memory"] / 2 ** 20:>10.1f} MB'
+		      f'{r["evaluations"]:>14} evals', flush=True)
+
+	output = Path(args.output) if args.output else \
+		RESULTS_DIR / f'{commit}.json'
+	output.parent.mkdir(parents=True, exist_ok=True)
+	output.write_text(json.dumps({
+		'commit': commit,
+		'python': platform.python_version(),
+		'numpy': np.__version__,
+		'machine': platform.machine(),
+		'results': results,
+	}, indent=1))
+	print(f'Saved to {output}')
+
+	if args.compare:
+		old = json.loads(Path(args.compare).read_text())['results']
+		regressions = compare(old, results, args.threshold)
+		for line in regressions:
+			print('REGRESSION', line)
+		if regressions:
+			return 1
+	return 0
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,72 @@
+import integrals
+
+FUNCTIONS = {
+	'function_1': (integrals.function_1, 1.0, 3.0),
+	'function_2': (integrals.function_2, 0.0, 2.0),
+}
+
+RULES = {
+	'left_rectangle': integrals.left_rectangle,
+	'right_rectangle': integrals.right_rectangle,
+	'trapezoidal': integrals.trapezoidal,
+	'simpson_rule': integrals.simpson_rule,
+	'romberg': integrals.romberg,
+	'gauss_legendre': integrals.gauss_legendre,
+}
+
+RUNGE_TOLERANCE = 1e-6
+
+def make_cases(max_exp):
+	"""
+	    Returns benchmark cases as {case_id: (func_name, run)}, where
+	    run(func, a, b) performs the measured call.
+
+	    Rules, integrate_all and integrals_span are measured for
+	    n = 10^2 .. 10^max_exp; find_common_step and runge_rule don't
+	    depend on a size and are measured once per function.
+	"""
+	cases = {}
+	for func_name in FUNCTIONS:
+		for exp in range(2, max_exp + 1):
+			n = 10 ** exp
+			for rule_name, rule in RULES.items():
+				cases[f'{rule_name}/{func_name}/n=1e{exp}'] = (
+					func_name,
+					lambda func, a, b, rule=rule, n=n: rule(func, a, b, n)
+				)
+			cases[f'integrate_all/{func_name}/n=1e{exp}'] = (
+				func_name,
+				lambda func, a, b, n=n: integrals.integrate_all(func, a, b, n)
+			)
+			cases[f'integrals_span/{func_name}/n=1e{exp}'] = (
+				func_name,
+				lambda func, a, b, n=n: integrals.integrals_span(func, a, b, n)
+			)
+
+		cases[f'find_common_step/{func_name}'] = (
+			func_name,
+			lambda func, a, b: integrals.find_common_step(func, a, b, 10)
+		)
+		for rule_name, rule in RULES.items():
+			# Методы вне NestedGrid.METHODS всегда считаются заново
+			modes = (False, True) if rule in integrals.NestedGrid.METHODS \
+				else (False,)
+			for incremental in modes:
+				mode = 'incremental' if incremental else 'full'
+				cases[f'runge_rule/{rule_name}/{mode}/{func_name}'] = (
+					func_name,
+					lambda func, a, b, rule=rule, incremental=incremental:
+						integrals.runge_rule(rule, func, a, b, 10,
+						                     RUNGE_TOLERANCE, incremental)
+				)
+		cases[f'adaptive_gauss_kronrod/{func_name}'] = (
+			func_name,
+			lambda func, a, b: integrals.adaptive_gauss_kronrod(
+				func, a, b, RUNGE_TOLERANCE)
+		)
+		cases[f'runge_rule_all/{func_name}'] = (
+			func_name,
+			lambda func, a, b: integrals.runge_rule_all(func, a, b, 10,
+			                                            RUNGE_TOLERANCE)
+		)
+	return cases
@@ -0,0 +1,266 @@
+import ast
+from functools import lru_cache
+
+import numpy as np
+
+from integrals import DomainError, ZeroDenominatorError, EmptyInput
+
+
+class ExpressionError(Exception):
+	"""Raised when a formula can't be parsed or uses forbidden syntax."""
+	pass
+
+CONSTANTS = {
+	'pi': np.pi,
+	'e': np.e,
+}
+
+FUNCTIONS = {
+	'sin': np.sin,
+	'cos': np.cos,
+	'tan': np.tan,
+	'arcsin': np.arcsin,
+	'arccos': np.arccos,
+	'arctan': np.arctan,
+	'sinh': np.sinh,
+	'cosh': np.cosh,
+	'tanh': np.tanh,
+	'exp': np.exp,
+	'log': np.log,
+	'ln': np.log,
+	'log10': np.log10,
+	'sqrt': np.sqrt,
+	'abs': np.abs,
+}
+
+BIN_OPS = {
+	ast.Add: np.add,
+	ast.Sub: np.subtract,
+	ast.Mult: np.multiply,
+	ast.Div: np.divide,
+	ast.Pow: np.power,
+}
+
+# Проверки области определения: ufunc -> [(ошибка, предикат от аргументов)]
+CHECKS = {
+	np.sqrt: [(DomainError, lambda arg: arg < 0)],
+	np.log: [(DomainError, lambda arg: arg <= 0)],
+	np.log10: [(DomainError, lambda arg: arg <= 0)],
+	np.arcsin: [(DomainError, lambda arg: np.abs(arg) > 1)],
+	np.arccos: [(DomainError, lambda arg: np.abs(arg) > 1)],
+	np.divide: [(ZeroDenominatorError, lambda num, den: den == 0)],
+	np.power: [
+		(DomainError, lambda base, exp: (base < 0) & (exp != np.floor(exp))),
+		(ZeroDenominatorError, lambda base, exp: (base == 0) & (exp < 0)),
+	],
+}
+
+
+class Kernel:
+	"""
+	    Vectorized function of x (or of several variables) compiled from
+	    a formula.
+
+	    The formula is stored as a list of ufunc calls over numbered slots,
+	    the first slots are the variables. Equal subexpressions share one slot and constant
+	    subexpressions are folded, so every subexpression is computed once.
+	    Buffers of slots that are no longer needed are reused as `out=`.
+
+	    Like `integrals.function_1`, the kernel computes without checks
+	    and looks for domain errors only if the result is not finite.
+
+	    Args:
+	        expression (str): Normalized formula.
+	        ops (list): (ufunc, args, out_slot) triples, args are
+	            ('slot', i) or ('const', value).
+	        result: ('slot', i) or ('const', value) with the answer.
+	        variables (tuple): Names of the arguments, in call order.
+	"""
+
+	def __init__(self, expression, ops, result, variables=('x',)):
+		self.expression = expression
+		self.ops = ops
+		self.result = result
+		self.variables = variables
+		self.plan = self.make_plan()
+
+	def __repr__(self):
+		return f'Kernel({self.expression!r})'
+
+	def make_plan(self):
+		"""Picks a buffer for every op, reusing buffers of dead slots."""
+		last_use = {}
+		for i, (_, args, _) in enumerate(self.ops):
+			for kind, value in args:
+				if kind == 'slot':
+					last_use[value] = i
+
+		plan = []
+		for i, (ufunc, args, out_slot) in enumerate(self.ops):
+			reuse = None
+			for kind, value in args:
+				if kind == 'slot' and value >= len(self.variables) and \
+					last_use[value] == i:
+					reuse = value
+					break
+			plan.append((ufunc, args, out_slot, reuse))
+		return plan
+
+	def __call__(self, *args):
+		if len(args) != len(self.variables):
+			raise TypeError(f'{self!r} takes {len(self.variables)} arguments')
+		# Аргументы приводятся к общей форме, например t и (m, 1) столбец y
+		arrays = np.broadcast_arrays(*[np.array(arg, dtype='float64')
+		                               for arg in args])
+		x_arr = arrays[0]
+		kind, value = self.result
+		if kind == 'const':
+			return np.full_like(x_arr, value)[()]
+
+		buffers = dict(enumerate(arrays))
+		with np.errstate(all='ignore'):
+			for ufunc, args, out_slot, reuse in self.plan:
+				values = [buffers[v] if k == 'slot' else v for k, v in args]
+				if reuse is None:
+					out = np.empty_like(x_arr)
+				else:
+					out = buffers.pop(reuse)
+				buffers[out_slot] = ufunc(*values, out=out)
+		result = buffers[value]
+
+		bad = ~np.isfinite(result)
+		if np.any(bad):
+			self.check(*[array[bad] for array in arrays])
+		return result[()]
+
+	def check(self, *args):
+		"""Recomputes the formula on the arguments and raises the first kind
+		of error found (domain errors before zero denominators)."""
+		buffers = dict(enumerate(args))
+		domain_error = False
+		zero_error = False
+		with np.errstate(all='ignore'):
+			for ufunc, args, out_slot in self.ops:
+				values = [buffers[v] if k == 'slot' else v for k, v in args]
+				for error, predicate in CHECKS.get(ufunc, []):
+					if np.any(predicate(*values)):
+						if error is DomainError:
+							domain_error = True
+						else:
+							zero_error = True
+				buffers[out_slot] = ufunc(*values)
+		if domain_error:
+			raise DomainError
+		if zero_error:
+			raise ZeroDenominatorError
+
+
+class Compiler(ast.NodeVisitor):
+	"""Turns a whitelisted expression tree into `Kernel` ops."""
+
+	def __init__(self, variables=('x',)):
+		self.variables = variables
+		self.ops = []
+		self.slots = {}
+
+	def emit(self, ufunc, args):
+		# Ключ подвыражения — функция и ее аргументы, так одинаковые
+		# подвыражения получают один слот
+		key = (ufunc, tuple(args))
+		if key not in self.slots:
+			if all(kind == 'const' for kind, _ in args):
+				with np.errstate(all='ignore'):
+					value = float(ufunc(*[v for _, v in args]))
+				if np.isfinite(value):
+					return ('const', value)
+			self.slots[key] = len(self.slots) + len(self.variables)
+			self.ops.append((ufunc, tuple(args), self.slots[key]))
+		return ('slot', self.slots[key])
+
+	def generic_visit(self, node):
+		raise ExpressionError(f'Unsupported syntax: {type(node).__name__}')
+
+	def visit_Expression(self, node):
+		return self.visit(node.body)
+
+	def visit_Constant(self, node):
+		if isinstance(node.value, bool) or \
+			not isinstance(node.value, (int, float)):
+			raise ExpressionError(f'Unsupported constant: {node.value!r}')
+		return ('const', float(node.value))
+
+	def visit_Name(self, node):
+		if node.id in self.variables:
+			return ('slot', self.variables.index(node.id))
+		if node.id in CONSTANTS:
+			return ('const', CONSTANTS[node.id])
+		raise ExpressionError(f'Unknown name: {node.id}')
+
+	def visit_UnaryOp(self, node):
+		operand = self.visit(node.operand)
+		if isinstance(node.op, ast.UAdd):
+			return operand
+		if isinstance(node.op, ast.USub):
+			return self.emit(np.negative, [operand])
+		raise ExpressionError(f'Unsupported operator: {type(node.op).__name__}')
+
+	def visit_BinOp(self, node):
+		if type(node.op) not in BIN_OPS:
+			raise ExpressionError(
+				f'Unsupported operator: {type(node.op).__name__}')
+		left = self.visit(node.left)
+		right = self.visit(node.right)
+		if isinstance(node.op, ast.Pow) and right == ('const', 2.0):
+			return self.emit(np.square, [left])
+		return self.emit(BIN_OPS[type(node.op)], [left, right])
+
+	def visit_Call(self, node):
+		if not isinstance(node.func, ast.Name) or \
+			node.func.id not in FUNCTIONS:
+			raise ExpressionError(f'Unknown function: {ast.unparse(node.func)}')
+		if len(node.args) != 1 or node.keywords:
+			raise ExpressionError(f'{node.func.id} takes exactly one argument')
+		return self.emit(FUNCTIONS[node.func.id], [self.visit(node.args[0])])
+
+
+@lru_cache(maxsize=128)
+def compile_normalized(expression, variables=('x',)):
+	"""Compiles a normalized formula, see `compile_expression`."""
+	tree = ast.parse(expression, mode='eval')
+	compiler = Compiler(variables)
+	result = compiler.visit(tree)
+	return Kernel(expression, compiler.ops, result, variables)
+
+@lru_cache(maxsize=128)
+def compile_expression(text, variables=('x',)):
+	"""
+	    Compiles a formula of x, e.g. 'sin(0.8*x+0.3)/(1.2+cos(x**2+0.4))',
+	    into a vectorized `Kernel`.
+
+	    Notes:
+	        - Allowed: numbers, the variables, pi, e, + - * / **, and
+	          functions from FUNCTIONS; '^' may be used for power.
+	        - With several variables the kernel takes them as arguments
+	          in the same order, broadcast against each other.
+	        - Kernels are cached both by the raw text and by the normalized
+	          formula, so the same formula is parsed and compiled only once.
+
+	    Raises:
+	        EmptyInput: If the formula is empty.
+	        ExpressionError: If the formula can't be parsed or uses
+	            anything outside the whitelist.
+
+	    Args:
+	        text (str): Formula.
+	        variables (tuple): Names of the variables, ('x',) by default.
+
+	    Returns:
+	        Kernel: Callable computing the formula elementwise.
+	"""
+	if text.strip() == '':
+		raise EmptyInput("You didn't enter function")
+	try:
+		tree = ast.parse(text.strip().replace('^', '**'), mode='eval')
+	except SyntaxError:
+		raise ExpressionError(f'Invalid formula: {text}')
+	return compile_normalized(ast.unparse(tree), tuple(variables))
@@ -1,3 +1,14 @@
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import lru_cache
+import itertools
+import math
+import re
+import threading
+import time
+import weakref
+
 import numpy as np
 
 class DomainError(Exception):
@@ -20,6 +31,10 @@ class EmptyInput(Exception):
 class NonNumInput(Exception):
 	pass
 
+class CalculationCancelled(Exception):
+	"""Raised by a progress callback to stop a long calculation."""
+	pass
+
 def function_1(x_arr):
 	"""
 	   Computes the first example function:
@@ -37,17 +52,33 @@ def function_1(x_arr):
 	   """
 
 	x_arr = np.array(x_arr, dtype='float64')
-	sqrt_expr1 = 1.5 * x_arr + 1
-	sqrt_expr2 = 3 * x_arr ** 2 - 1.8
-
-	if np.any(sqrt_expr1 < 0):
-		raise DomainError
-	if np.any(sqrt_expr2 < 0):
-		raise DomainError
-	if np.any(1.2 * x_arr + np.sqrt(sqrt_expr2) == 0):
-		raise ZeroDenominatorError
 
-	return np.sqrt(sqrt_expr1) / (1.2 * x_arr + np.sqrt(sqrt_expr2))
+	# Каждое подвыражение считается один раз, на месте. Ошибки ищем
+	# уже по результату: корень из отрицательного дает nan, ноль
+	# в знаменателе — inf или nan.
+	with np.errstate(invalid='ignore', divide='ignore'):
+		result = np.multiply(x_arr, 1.5, out=np.empty_like(x_arr))
+		result += 1
+		np.sqrt(result, out=result)
+
+		denominator = np.square(x_arr, out=np.empty_like(x_arr))
+		denominator *= 3
+		denominator -= 1.8
+		np.sqrt(denominator, out=denominator)
+		denominator += 1.2 * x_arr
+
+		np.divide(result, denominator, out=result)
+
+	bad = ~np.isfinite(result)
+	if np.any(bad):
+		x_bad = x_arr[bad]
+		if np.any((1.5 * x_bad + 1 < 0) | (3 * x_bad ** 2 - 1.8 < 0)):
+			raise DomainError
+		if np.any(denominator[bad] == 0):
+			raise ZeroDenominatorError
+
+	# [()] превращает 0-d массив обратно в число, как было раньше
+	return result[()]
 
 def function_2(x_arr):
 	"""
@@ -66,12 +97,145 @@ def function_2(x_arr):
 
 	x_arr = np.array(x_arr, dtype='float64')
 
-	if np.any(1.2 + np.cos(x_arr ** 2 + 0.4) == 0):
+	with np.errstate(invalid='ignore', divide='ignore'):
+		denominator = np.square(x_arr, out=np.empty_like(x_arr))
+		denominator += 0.4
+		np.cos(denominator, out=denominator)
+		denominator += 1.2
+
+		result = np.multiply(x_arr, 0.8, out=np.empty_like(x_arr))
+		result += 0.3
+		np.sin(result, out=result)
+		np.divide(result, denominator, out=result)
+
+	bad = ~np.isfinite(result)
+	if np.any(bad) and np.any(denominator[bad] == 0):
 		raise ZeroDenominatorError
 
-	return np.sin(0.8 * x_arr + 0.3)/(1.2 + np.cos(x_arr ** 2 + 0.4))
+	return result[()]
+
+class Stats:
+	"""
+	    Counters and per-phase timings collected while instrumentation is
+	    on (see `enable_stats`).
+
+	    Phases, in nanoseconds of perf_counter_ns:
+	        validate — validate_input
+	        grid     — building grid points
+	        evaluate — calls of the integrand (summed over worker threads)
+	        sum      — accumulating sums over evaluated blocks
+	        span     — comparing methods in integrals_span
+
+	    Also counts integrand calls and evaluated points, and records
+	    (method, n, error_estimate) of every runge_rule step and
+	    (n, span) of every find_common_step probe.
+	"""
+	PHASES = ('validate', 'grid', 'evaluate', 'sum', 'span')
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.reset()
+
+	def reset(self):
+		with self.lock:
+			self.phase_ns = dict.fromkeys(self.PHASES, 0)
+			self.func_calls = 0
+			self.evaluations = 0
+			self.runge_steps = []
+			self.search_steps = []
+
+	def add_time(self, phase, start_ns):
+		elapsed = time.perf_counter_ns() - start_ns
+		with self.lock:
+			self.phase_ns[phase] += elapsed
+
+	def counted(self, func):
+		"""Wraps func to count evaluated points and time the calls."""
+		def wrapper(x_arr):
+			start = time.perf_counter_ns()
+			result = func(x_arr)
+			elapsed = time.perf_counter_ns() - start
+			with self.lock:
+				self.phase_ns['evaluate'] += elapsed
+				self.func_calls += 1
+				self.evaluations += np.size(x_arr)
+			return result
+		return wrapper
+
+	def timed_iteration(self, iterable, phase):
+		"""Yields from iterable, adding the time spent producing items."""
+		iterator = iter(iterable)
+		while True:
+			start = time.perf_counter_ns()
+			try:
+				item = next(iterator)
+			except StopIteration:
+				return
+			self.add_time(phase, start)
+			yield item
+
+	def timed_consumer(self, iterable, phase):
+		"""Yields from iterable, adding the time the consumer spends on
+		each item before asking for the next one."""
+		for item in iterable:
+			start = time.perf_counter_ns()
+			yield item
+			self.add_time(phase, start)
+
+	def as_dict(self):
+		with self.lock:
+			return {
+				'phase_ms': {phase: ns / 1e6
+				             for phase, ns in self.phase_ns.items()},
+				'func_calls': self.func_calls,
+				'evaluations': self.evaluations,
+				'runge_steps': list(self.runge_steps),
+				'search_steps': list(self.search_steps),
+			}
+
+	def report(self):
+		"""Returns the stats as a short multi-line text."""
+		data = self.as_dict()
+		lines = [f'evaluations: {data["evaluations"]} points, '
+		         f'{data["func_calls"]} calls']
+		for phase, ms in data['phase_ms'].items():
+			lines.append(f'{phase:<9}{ms:>10.2f} ms')
+		for n, span in data['search_steps'][-5:]:
+			lines.append(f'search n={n} span={span:.3g}')
+		for method, n, error in data['runge_steps'][-5:]:
+			lines.append(f'{method} n={n} err={error:.3g}')
+		return '\n'.join(lines)
+
+# Инструментирование выключено, пока stats is None: все точки замера
+# стоят за одной проверкой и почти ничего не стоят
+stats = None
+
+def enable_stats():
+	"""Turns instrumentation on and returns a fresh `Stats`."""
+	global stats
+	stats = Stats()
+	return stats
+
+def disable_stats():
+	"""Turns instrumentation off and returns the collected `Stats`."""
+	global stats
+	collected = stats
+	stats = None
+	return collected
+
+@contextmanager
+def collect_stats():
+	"""with collect_stats() as st: ... — instrumentation for a block."""
+	collected = enable_stats()
+	try:
+		yield collected
+	finally:
+		disable_stats()
 
 def validate_input(a, b, n):
+	current_stats = stats
+	if current_stats is not None:
+		start = time.perf_counter_ns()
 	if a== '' and b == '' and n == '':
 		raise EmptyInput("Чтобы прога работала, необходимо ввести значения:)")
 	if b == '' and n == '':
@@ -96,6 +260,8 @@ def validate_input(a, b, n):
 		raise StepError('Stride must be an integer')
 	if n < 1:
 		raise StepError('Step must be at least 1')
+	if current_stats is not None:
+		current_stats.add_time('validate', start)
 	return a, b, n
 
 def validate_tolerance(tolerance):
@@ -107,7 +273,323 @@ def validate_tolerance(tolerance):
 		raise NonNumInput('Tolerance must be a number')
 	return tolerance
 
-def left_rectangle(func, a, b, n):
+def parse_values(text):
+	"""Parses numbers separated by commas, semicolons or spaces."""
+	parts = [part for part in re.split(r'[\s,;]+', text.strip()) if part]
+	if not parts:
+		raise EmptyInput("You didn't enter values")
+	try:
+		return np.array([float(part) for part in parts])
+	except ValueError:
+		raise NonNumInput('Values must be numbers')
+
+# Сколько точек сетки вычисляется за раз. При n больше этого значения
+# интеграл считается по блокам и память не зависит от n.
+BLOCK_SIZE = 2 ** 20
+
+def grid_stride(a, b, n):
+	"""Returns the stride of the grid np.linspace(a, b, n+1), computed the
+	same way as x_arr[1] - x_arr[0]."""
+	if n == 1:
+		return b - a
+	return ((b - a) / n + a) - a
+
+def grid_blocks(a, b, n, first, last, block_size=BLOCK_SIZE):
+	"""
+	    Yields points x_first..x_last of the grid np.linspace(a, b, n+1)
+	    in consecutive blocks of at most `block_size` points.
+
+	    Points are computed exactly as np.linspace does, so the blocks put
+	    together are equal to the in-memory grid.
+
+	    Args:
+	        a (float): Lower limit of integration.
+	        b (float): Upper limit of integration.
+	        n (int): Number of subintervals.
+	        first (int): Index of the first point.
+	        last (int): Index of the last point (inclusive).
+	        block_size (int or None): Points per block, None for one block.
+
+	    Yields:
+	        tuple: (i0, x_arr) — index of the first point in the block and
+	        the block itself.
+	"""
+	step = (b - a) / n
+	if block_size is None:
+		block_size = last - first + 1
+	for i0 in range(first, last + 1, block_size):
+		i1 = min(i0 + block_size, last + 1)
+		x_arr = np.arange(i0, i1, dtype='float64') * step + a
+		if i1 == n + 1:
+			x_arr[-1] = b
+		yield i0, x_arr
+
+def map_blocks(func, blocks, workers=1):
+	"""See `evaluate_blocks`; also feeds `stats` when it is enabled."""
+	current_stats = stats
+	if current_stats is None:
+		return evaluate_blocks(func, blocks, workers)
+	return current_stats.timed_consumer(
+		evaluate_blocks(current_stats.counted(func),
+		                current_stats.timed_iteration(blocks, 'grid'),
+		                workers),
+		'sum'
+	)
+
+def evaluate_blocks(func, blocks, workers=1):
+	"""
+	    Yields (i0, func(x_arr)) for every (i0, x_arr) in `blocks`.
+
+	    With workers > 1 blocks are evaluated in a thread pool (NumPy
+	    releases the GIL inside ufuncs), at most 2 * workers blocks at a
+	    time. Results are always yielded in block order, so sums over
+	    them do not depend on the number of workers.
+
+	    Args:
+	        func (callable): Function to evaluate.
+	        blocks (iterable): Pairs (i0, x_arr), e.g. from `grid_blocks`.
+	        workers (int): Number of threads.
+	"""
+	if workers <= 1:
+		for i0, x_arr in blocks:
+			yield i0, func(x_arr)
+		return
+
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		pending = deque()
+		for i0, x_arr in blocks:
+			pending.append((i0, executor.submit(func, x_arr)))
+			if len(pending) >= 2 * workers:
+				i0, future = pending.popleft()
+				yield i0, future.result()
+		while pending:
+			i0, future = pending.popleft()
+			yield i0, future.result()
+
+def eval_blocks(func, a, b, n, first, last, block_size=BLOCK_SIZE,
+                workers=1):
+	"""Yields (i0, func(x_arr)) for every block of `grid_blocks`."""
+	return map_blocks(func, grid_blocks(a, b, n, first, last, block_size),
+	                  workers)
+
+def inner_parity(i0, n, func_arr):
+	"""Splits a block starting at point i0 into values at odd and even
+	inner points of the grid (endpoints 0 and n excluded)."""
+	lo = 1 if i0 == 0 else 0
+	hi = len(func_arr) - 1 if i0 + len(func_arr) == n + 1 else len(func_arr)
+	inner_arr = func_arr[lo:hi]
+	odd_arr = inner_arr[(i0 + lo + 1) % 2::2]
+	even_arr = inner_arr[(i0 + lo) % 2::2]
+	return odd_arr, even_arr
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+class ResultCache:
+	"""
+	    Thread-safe LRU cache of integral approximations, keyed on
+	    (func, a, b, n, method name).
+
+	    Notes:
+	        - Functions are keyed by id and held by a weak reference, so
+	          closures, splines and fitted models don't stay alive because
+	          of the cache; their entries are dropped once they are
+	          collected. Objects without weak references (NumPy ufuncs)
+	          are kept as keys themselves, they live as long as the
+	          process anyway.
+
+	    Args:
+	        maxsize (int): Number of entries kept, least recently used
+	            entries are evicted first.
+	"""
+
+	def __init__(self, maxsize=4096):
+		self.maxsize = maxsize
+		self.hits = 0
+		self.misses = 0
+		self.entries = OrderedDict()
+		self.lock = threading.Lock()
+		self.watched = {}
+		# id собранных функций; колбэк weakref может сработать в любом
+		# потоке, в том числе под self.lock, поэтому он только дописывает
+		# в список, а записи удаляются в purge
+		self.dead = []
+
+	def func_key(self, func):
+		"""Returns the part of the key standing for func."""
+		with self.lock:
+			self.purge()
+			key = id(func)
+			if key not in self.watched:
+				try:
+					finalizer = weakref.finalize(func, self.dead.append, key)
+				except TypeError:
+					return func
+				finalizer.atexit = False
+				self.watched[key] = finalizer
+			return key
+
+	def purge(self):
+		"""Drops entries of collected functions, called under the lock."""
+		if not self.dead:
+			return
+		dead = set()
+		while self.dead:
+			dead.add(self.dead.pop())
+		for key in dead:
+			self.watched.pop(key, None)
+		for key in [key for key in self.entries if key[0] in dead]:
+			del self.entries[key]
+
+	def get(self, key):
+		"""Returns the cached value or None."""
+		with self.lock:
+			self.purge()
+			if key in self.entries:
+				self.hits += 1
+				self.entries.move_to_end(key)
+				return self.entries[key]
+			self.misses += 1
+			return None
+
+	def put(self, key, value):
+		with self.lock:
+			self.purge()
+			self.entries[key] = value
+			self.entries.move_to_end(key)
+			if len(self.entries) > self.maxsize:
+				self.entries.popitem(last=False)
+
+	def clear(self):
+		with self.lock:
+			self.entries.clear()
+			self.hits = 0
+			self.misses = 0
+
+	def info(self):
+		"""Returns hit/miss statistics like functools.lru_cache does."""
+		with self.lock:
+			self.purge()
+			return CacheInfo(self.hits, self.misses, self.maxsize,
+			                 len(self.entries))
+
+results_cache = ResultCache()
+
+# Способ суммирования по блокам и число знаков округления результатов;
+# меняются через set_precision / precision
+SUMMATION = 'pairwise'
+ROUND_DIGITS = 5
+
+SUMMATIONS = ('pairwise', 'neumaier', 'fsum')
+
+def set_precision(summation='pairwise', digits=5):
+	"""
+	    Sets how the rules add up function values and round results.
+
+	    Args:
+	        summation (str): 'pairwise' — np.sum inside blocks and a plain
+	            float across them (fastest, the default); 'neumaier' —
+	            compensated sum of block sums; 'fsum' — correctly rounded
+	            sum of all values but slowest. See `Accumulator`.
+	        digits (int or None): Digits results are rounded to, None to
+	            keep them unrounded.
+
+	    Raises:
+	        ValueError: If the summation is unknown.
+	"""
+	global SUMMATION, ROUND_DIGITS
+	if summation not in SUMMATIONS:
+		raise ValueError(f'Unknown summation: {summation}')
+	SUMMATION = summation
+	ROUND_DIGITS = digits
+
+@contextmanager
+def precision(summation='pairwise', digits=5):
+	"""with precision('fsum'): ... — `set_precision` for a block."""
+	saved = SUMMATION, ROUND_DIGITS
+	set_precision(summation, digits)
+	try:
+		yield
+	finally:
+		set_precision(*saved)
+
+def round_result(value):
+	if ROUND_DIGITS is None:
+		return value
+	return np.round(value, ROUND_DIGITS)
+
+def cache_key(func, a, b, n, name):
+	"""Key of `results_cache`; results depend on the precision settings."""
+	return (results_cache.func_key(func), a, b, n, name, SUMMATION,
+	        ROUND_DIGITS)
+
+def exact_parts(values):
+	"""
+	    Returns a few floats whose exact sum is the exact sum of values.
+
+	    Each pass of math.fsum gives the correctly rounded remainder of
+	    the sum minus the parts found so far; the remainder shrinks to
+	    zero after a few passes (usually two or three).
+	"""
+	values = np.ravel(values).tolist()
+	parts = []
+	while True:
+		part = math.fsum(itertools.chain(values, [-p for p in parts]))
+		if part == 0:
+			return parts
+		parts.append(part)
+		if not math.isfinite(part):
+			return parts[-1:]
+
+class Accumulator:
+	"""
+	    Running sum of blocks of values, added up as SUMMATION says.
+
+	    'pairwise': every block is summed by NumPy pairwise summation
+	    (error grows as log of the block size), block sums are added as
+	    plain floats.
+
+	    'neumaier': blocks are summed the same way, but block sums are
+	    added with Neumaier compensation. This matters only when n ~ 10^8
+	    gives hundreds of blocks; for n below one block (BLOCK_SIZE) the
+	    result is the same as 'pairwise'.
+
+	    'fsum': every block is reduced to exact partial sums
+	    (`exact_parts`) and one math.fsum over the partials of all blocks
+	    gives the correctly rounded sum of all values. Several times
+	    slower than the others.
+	"""
+
+	def __init__(self):
+		self.summation = SUMMATION
+		self.total = 0.0
+		self.compensation = 0.0
+		self.parts = []
+
+	def add(self, values):
+		if self.summation == 'fsum':
+			self.parts.extend(exact_parts(values))
+			return
+		part = np.sum(values)
+		if self.summation == 'pairwise':
+			self.total += part
+			return
+		# Неймайер: сохраняем потерянные младшие разряды отдельно
+		total = self.total + part
+		if abs(self.total) >= abs(part):
+			self.compensation += (self.total - total) + part
+		else:
+			self.compensation += (part - total) + self.total
+		self.total = total
+
+	@property
+	def value(self):
+		if self.summation == 'fsum':
+			return math.fsum(self.parts)
+		if self.summation == 'pairwise':
+			return self.total
+		return self.total + self.compensation
+
+def left_rectangle(func, a, b, n, block_size=BLOCK_SIZE, workers=1):
 	"""
 	    Computes the definite integral of a function using the left rectangle method.
 
@@ -116,18 +598,30 @@ def left_rectangle(func, a, b, n):
 	        a (float): Lower limit of integration.
 	        b (float): Upper limit of integration.
 	        n (int): Number of points (subintervals = n-1).
+	        block_size (int or None): Points evaluated at once, None to
+	            evaluate the whole grid in memory.
+	        workers (int): Threads evaluating blocks in parallel.
 
 	    Returns:
 	        float: Approximation of the integral.
 	    """
 
 	a, b, n = validate_input(a, b, n)
-	x_arr = np.linspace(a, b, n+1, dtype='float64')
-	stride = x_arr[1] - x_arr[0]
-	func_arr = func(x_arr[:-1])
-	return np.round(np.sum(stride * func_arr),5)
-
-def right_rectangle(func, a, b, n):
+	key = cache_key(func, a, b, n, 'left_rectangle')
+	cached = results_cache.get(key)
+	if cached is not None:
+		return cached
+
+	stride = grid_stride(a, b, n)
+	total = Accumulator()
+	blocks = eval_blocks(func, a, b, n, 0, n - 1, block_size, workers)
+	for _, func_arr in blocks:
+		total.add(stride * func_arr)
+	result = round_result(total.value)
+	results_cache.put(key, result)
+	return result
+
+def right_rectangle(func, a, b, n, block_size=BLOCK_SIZE, workers=1):
 	"""
 	    Computes the definite integral of a function using the right rectangle method.
 
@@ -136,17 +630,29 @@ def right_rectangle(func, a, b, n):
 	        a (float): Lower limit of integration.
 	        b (float): Upper limit of integration.
 	        n (int): Number of points (subintervals = n-1).
+	        block_size (int or None): Points evaluated at once, None to
+	            evaluate the whole grid in memory.
+	        workers (int): Threads evaluating blocks in parallel.
 
 	    Returns:
 	        float: Approximation of the integral.
 	    """
 	a, b, n = validate_input(a, b, n)
-	x_arr = np.linspace(a, b, n+1, dtype='float64')
-	stride = x_arr[1] - x_arr[0]
-	func_arr = func(x_arr[1:])
-	return np.round(np.sum(stride * func_arr),5)
-
-def trapezoidal(func, a, b, n):
+	key = cache_key(func, a, b, n, 'right_rectangle')
+	cached = results_cache.get(key)
+	if cached is not None:
+		return cached
+
+	stride = grid_stride(a, b, n)
+	total = Accumulator()
+	blocks = eval_blocks(func, a, b, n, 1, n, block_size, workers)
+	for _, func_arr in blocks:
+		total.add(stride * func_arr)
+	result = round_result(total.value)
+	results_cache.put(key, result)
+	return result
+
+def trapezoidal(func, a, b, n, block_size=BLOCK_SIZE, workers=1):
 	"""
     Computes the definite integral of a function using the trapezoidal rule.
 
@@ -155,17 +661,34 @@ def trapezoidal(func, a, b, n):
         a (float): Lower limit of integration.
         b (float): Upper limit of integration.
         n (int): Number of points (subintervals = n-1).
+        block_size (int or None): Points evaluated at once, None to
+            evaluate the whole grid in memory.
+        workers (int): Threads evaluating blocks in parallel.
 
     Returns:
         float: Approximation of the integral.
     """
 	a, b, n = validate_input(a, b, n)
-	x_arr = np.linspace(a, b, n+1, dtype='float64')
-	stride = x_arr[1] - x_arr[0]
-	return np.round(np.sum((func(x_arr[:-1]) + func(x_arr[1:])) * stride /
-	                      2), 5)
-
-def simpson_rule(func, a, b, n):
+	key = cache_key(func, a, b, n, 'trapezoidal')
+	cached = results_cache.get(key)
+	if cached is not None:
+		return cached
+
+	stride = grid_stride(a, b, n)
+	total = Accumulator()
+	prev = None
+	blocks = eval_blocks(func, a, b, n, 0, n, block_size, workers)
+	for _, func_arr in blocks:
+		# Трапеция между соседними блоками
+		if prev is not None:
+			total.add((prev + func_arr[0]) * stride / 2)
+		total.add((func_arr[:-1] + func_arr[1:]) * stride / 2)
+		prev = func_arr[-1]
+	result = round_result(total.value)
+	results_cache.put(key, result)
+	return result
+
+def simpson_rule(func, a, b, n, block_size=BLOCK_SIZE, workers=1):
 	"""
 	    Computes the definite integral of a function using Simpson's rule.
 
@@ -178,6 +701,9 @@ def simpson_rule(func, a, b, n):
 	        a (float): Lower limit of integration.
 	        b (float): Upper limit of integration.
 	        n (int): Number of points (subintervals = n-1).
+	        block_size (int or None): Points evaluated at once, None to
+	            evaluate the whole grid in memory.
+	        workers (int): Threads evaluating blocks in parallel.
 
 	    Returns:
 	        float: Approximation of the integral.
@@ -187,52 +713,256 @@ def simpson_rule(func, a, b, n):
 		raise EvenStepWarning('Simpson rule is only implemented for'
 		                      ' even number of subintervals.')
 
+	key = cache_key(func, a, b, n, 'simpson_rule')
+	cached = results_cache.get(key)
+	if cached is not None:
+		return cached
+
+	stride = grid_stride(a, b, n)
+	add_sum = Accumulator()
+	even_sum = Accumulator()
+	blocks = eval_blocks(func, a, b, n, 0, n, block_size, workers)
+	for i0, func_arr in blocks:
+		if i0 == 0:
+			f_a = func_arr[0]
+		odd_arr, even_arr = inner_parity(i0, n, func_arr)
+		add_sum.add(4 * odd_arr)
+		even_sum.add(2 * even_arr)
+	f_b = func_arr[-1]
+	result = round_result((f_a + add_sum.value + even_sum.value + f_b) *
+	                      stride / 3)
+	results_cache.put(key, result)
+	return result
+
+
+def integrate_all(func, a, b, n, block_size=BLOCK_SIZE, workers=1,
+                  progress=None):
+	"""
+	    Computes left/right rectangles, trapezoidal, Simpson and Romberg
+	    approximations from a single sampling of the function on the grid.
 
-	x_arr = np.linspace(a, b, n+1, dtype='float64')
-	stride = x_arr[1] - x_arr[0]
-	func_arr = func(x_arr)
-	add_sum = np.sum(4 * func_arr[1:-1:2])
-	even_sum = np.sum(2 * func_arr[2:-1:2])
-	return np.round(((func_arr[0] + add_sum + even_sum + func_arr[-1]) *
-	        stride / 3), 5)
+	    Notes:
+	        - func is evaluated once on n+1 points, all rules reuse it;
+	          the Romberg table is built from sums over every 2nd, 4th
+	          and 8th point of the same grid.
+	        - Simpson result is None if n is odd.
+	        - Results are taken from and stored to `results_cache`.
 
+	    Args:
+	        func (callable): Function to integrate.
+	        a (float): Lower limit of integration.
+	        b (float): Upper limit of integration.
+	        n (int): Number of subintervals.
+	        block_size (int or None): Points evaluated at once, None to
+	            evaluate the whole grid in memory.
+	        workers (int): Threads evaluating blocks in parallel.
+	        progress (callable): Called as progress(points) after every
+	            block, may raise CalculationCancelled.
+
+	    Returns:
+	        dict: Approximations keyed by method name.
+	    """
+	a, b, n = validate_input(a, b, n)
+	names = ['left_rectangle', 'right_rectangle', 'trapezoidal', 'romberg']
+	if n % 2 == 0:
+		names.append('simpson_rule')
+	results = dict.fromkeys(['left_rectangle', 'right_rectangle',
+	                         'trapezoidal', 'simpson_rule', 'romberg'])
+	for name in names:
+		results[name] = results_cache.get(cache_key(func, a, b, n, name))
+	if all(results[name] is not None for name in names):
+		return results
+
+	stride = grid_stride(a, b, n)
+	left_sum = Accumulator()
+	right_sum = Accumulator()
+	trap_sum = Accumulator()
+	add_sum = Accumulator()
+	even_sum = Accumulator()
+	# Суммы значений во всех узлах с индексом, кратным 2^k (включая концы),
+	# дают трапеции на n / 2^k для таблицы Ромберга
+	depth = romberg_depth(n)
+	level_sums = [Accumulator() for _ in range(depth + 1)]
+	prev = None
+	blocks = eval_blocks(func, a, b, n, 0, n, block_size, workers)
+	for i0, func_arr in blocks:
+		if i0 == 0:
+			f_a = func_arr[0]
+			right_sum.add(stride * func_arr[1:])
+		else:
+			right_sum.add(stride * func_arr)
+		if i0 + len(func_arr) == n + 1:
+			left_sum.add(stride * func_arr[:-1])
+		else:
+			left_sum.add(stride * func_arr)
+
+		if prev is not None:
+			trap_sum.add((prev + func_arr[0]) * stride / 2)
+		trap_sum.add((func_arr[:-1] + func_arr[1:]) * stride / 2)
+		prev = func_arr[-1]
+
+		if n % 2 == 0:
+			odd_arr, even_arr = inner_parity(i0, n, func_arr)
+			add_sum.add(4 * odd_arr)
+			even_sum.add(2 * even_arr)
+		for k, level_sum in enumerate(level_sums):
+			level_sum.add(func_arr[-i0 % 2 ** k::2 ** k])
+		if progress is not None:
+			progress(i0 + len(func_arr))
+	f_b = prev
+
+	results = {
+		'left_rectangle': round_result(left_sum.value),
+		'right_rectangle': round_result(right_sum.value),
+		'trapezoidal': round_result(trap_sum.value),
+		'simpson_rule': None,
+		'romberg': round_result(romberg_table([
+			(b - a) / (n >> k) * (level_sum.value - (f_a + f_b) / 2)
+			for k, level_sum in enumerate(level_sums)
+		])),
+	}
+	if n % 2 == 0:
+		results['simpson_rule'] = round_result(
+			(f_a + add_sum.value + even_sum.value + f_b) * stride / 3)
+	for name in names:
+		results_cache.put(cache_key(func, a, b, n, name), results[name])
+	return results
+
+def batch_weights(method, idx, n, stride):
+	"""Returns quadrature weights of `method` for points with local indices
+	`idx` on grids with `n` subintervals and stride `stride`."""
+	is_end = (idx == 0) | (idx == n)
+	if method == left_rectangle:
+		return np.where(idx < n, stride, 0.0)
+	elif method == right_rectangle:
+		return np.where(idx > 0, stride, 0.0)
+	elif method == trapezoidal:
+		return np.where(is_end, stride / 2, stride)
+	elif method == simpson_rule:
+		coef = np.where(is_end, 1.0, np.where(idx % 2 == 1, 4.0, 2.0))
+		return coef * stride / 3
+	else:
+		raise ValueError("Unknown integration method")
 
-def integrals_span(func, a, b, n):
+def integrate_batch(func, a_arr, b_arr, n, method):
+	"""
+	    Computes many integrals of one function with one call of func.
+
+	    Notes:
+	        - With a common n all grids form a 2-D (jobs x n+1) array.
+	        - With n given per job the grids are flattened one after another
+	          and reduced with np.add.reduceat.
+	        - Inputs must already be numbers, no string parsing is done.
+
+	    Args:
+	        func (callable): Function to integrate, must be elementwise.
+	        a_arr (array-like): Lower limits of integration.
+	        b_arr (array-like): Upper limits of integration.
+	        n (int or array-like): Number of subintervals, common or per job.
+	        method (callable): left_rectangle, right_rectangle, trapezoidal
+	            or simpson_rule.
+
+	    Raises:
+	        StepError: If some n is less than 1.
+	        EvenStepWarning: If Simpson is requested for odd n.
+
+	    Returns:
+	        np.ndarray: Approximations of the integrals, one per job
+	        (empty for an empty batch).
+	"""
+	a_arr, b_arr, n = np.broadcast_arrays(
+		np.asarray(a_arr, dtype='float64'),
+		np.asarray(b_arr, dtype='float64'),
+		np.asarray(n, dtype='int64'),
+	)
+	a_arr, b_arr, n = a_arr.ravel(), b_arr.ravel(), n.ravel()
+	if len(n) == 0:
+		return np.empty(0)
+	if np.any(n < 1):
+		raise StepError('Step must be at least 1')
+	if method == simpson_rule and np.any(n % 2 != 0):
+		raise EvenStepWarning('Simpson rule is only implemented for'
+		                      ' even number of subintervals.')
+
+	# Те же точки и шаг, что дает np.linspace(a, b, n+1)
+	step = (b_arr - a_arr) / n
+	stride = np.where(n == 1, b_arr - a_arr, (step + a_arr) - a_arr)
+
+	if np.all(n == n[0]):
+		n = n[0]
+		idx = np.arange(n + 1)
+		x_arr = idx * step[:, None] + a_arr[:, None]
+		x_arr[:, -1] = b_arr
+		weights = batch_weights(method, idx, n, stride[:, None])
+		return round_result(np.sum(weights * func(x_arr), axis=1))
+
+	counts = n + 1
+	offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+	idx = np.arange(np.sum(counts)) - np.repeat(offsets, counts)
+	x_arr = idx * np.repeat(step, counts) + np.repeat(a_arr, counts)
+	x_arr[offsets + n] = b_arr
+	weights = batch_weights(method, idx, np.repeat(n, counts),
+	                        np.repeat(stride, counts))
+	return round_result(np.add.reduceat(weights * func(x_arr), offsets))
+
+def integrals_span(func, a, b, n, workers=1, methods=None):
 	"""
 	   Returns the absolute difference between the maximum and minimum integral
 	   approximations computed by left/right rectangles, trapezoidal, and
-	   Simpson methods.
+	   Simpson methods, or by `methods` if given.
 
 	   This is a helper function used by `find_common_step`.
 	"""
+	a, b, n = validate_input(a, b, n)
+	if not n % 2 == 0:
+		raise EvenStepWarning('Simpson rule is only implemented for'
+		                      ' even number of subintervals.')
 
-	methods_results = np.array([
-		left_rectangle(func, a, b, n),
-		right_rectangle(func, a, b, n),
-		trapezoidal(func, a, b, n),
-		simpson_rule(func, a, b, n),
-	])
-	return np.trunc(np.max(methods_results) * 1000) / 1000 - np.trunc(np.min(
+	if methods is None:
+		results = integrate_all(func, a, b, n, workers=workers)
+		methods_results = np.array([results[method.__name__]
+		                            for method in NestedGrid.METHODS])
+	else:
+		methods_results = np.array([method(func, a, b, n, workers=workers)
+		                            for method in methods])
+	current_stats = stats
+	if current_stats is not None:
+		start = time.perf_counter_ns()
+	span = np.trunc(np.max(methods_results) * 1000) / 1000 - np.trunc(np.min(
 		methods_results) * 1000) / 1000
+	if current_stats is not None:
+		current_stats.add_time('span', start)
+	return span
 
-# Долго думал над классным супер-пупер оптимальным алгосом, наверное
-# надо применить бинарный поиск
-def find_common_step(func, a, b, n_start):
+def find_common_step(func, a, b, n_start, n_max=10 ** 8, workers=1,
+                     progress=None, methods=None):
 	"""
 	    Finds the minimal even number of subintervals `n` such that the integral approximations
 	    from left/right rectangles, trapezoidal, and Simpson methods agree within a given precision.
 
+	    Notes:
+	        - The bracket around n_min is found by doubling (or halving) n,
+	          then narrowed by bisection over even integers.
+	        - Each n is evaluated at most once.
+
 	    Args:
 	        func (callable): Function to integrate.
 	        a (float): Lower limit of integration.
 	        b (float): Upper limit of integration.
 	        n_start (int): Initial number of subintervals to start the search.
+	        n_max (int): Upper bound for the search.
+	        workers (int): Threads evaluating grid blocks in parallel.
+	        progress (callable): Called as progress(n, span) after every
+	            new n is checked, may raise CalculationCancelled.
+	        methods (list): Integration functions to compare, the four
+	            basic rules by default (see `integrals_span`).
 
 	    Returns:
 	        int: Minimal number of subintervals `n` meeting the precision criterion.
 
 	    Raises:
-	        StepError: If `n_start` is not a positive integer.
+	        StepError: If `n_start` is not a positive integer or no suitable
+	            `n` exists below `n_max`.
 	        OddStepWarning: If `n_start` is not even (Simpson requires even number of subintervals).
 	"""
 	a, b, n_start = validate_input(a, b, n_start)
@@ -240,51 +970,69 @@ def find_common_step(func, a, b, n_start):
 		raise EvenStepWarning('To compare methods we need Simpson, which '
 			'is only implemented for even number of subintervals.')
 
-	n = n_start
-	if integrals_span(func, a, b, n) == 0:
-		good_n = n
-		n -= 2
-		while n >= 2:
-			if integrals_span(func, a, b, n) > 0:
+	spans = {}
+	# stats могут выключить из GUI посреди поиска, берем один раз
+	current_stats = stats
+
+	def span(n):
+		if n not in spans:
+			spans[n] = integrals_span(func, a, b, n, workers, methods)
+			if current_stats is not None:
+				with current_stats.lock:
+					current_stats.search_steps.append((n, spans[n]))
+			if progress is not None:
+				progress(n, spans[n])
+		return spans[n]
+
+	# Ищем вилку bad_n < n_min <= good_n, bad_n = 0 — "заведомо плохое" n
+	if span(n_start) == 0:
+		good_n = n_start
+		bad_n = 0
+		while good_n > 2:
+			n = good_n // 2
+			n -= n % 2
+			if span(n) > 0:
+				bad_n = n
 				break
 			good_n = n
-			n -= 2
-		return good_n
-
-	bad_n = n
-	while True:
-		n = n ** 2
-		if integrals_span(func, a, b, n) == 0:
-			good_n = n
-			break
-		bad_n = n
-
-	# Осталось найти n_min между good_n и bad_n:
-	n_values = np.arange(bad_n, good_n, 2, dtype='int64')
-	low = 0
-	high = len(n_values) - 1
-
-	while low <= high:
-		mid = (low + high) // 2
-		guess = n_values[mid]
-		if integrals_span(func, a, b, int(guess)) == 0:
-			high = mid - 1
+	else:
+		bad_n = n_start
+		while True:
+			n = 2 * bad_n
+			if n > n_max:
+				raise StepError(f'Common step not found for n up to {n_max}')
+			if span(n) == 0:
+				good_n = n
+				break
+			bad_n = n
+
+	# Бинарный поиск по четным n внутри вилки
+	while good_n - bad_n > 2:
+		mid = (bad_n + good_n) // 2
+		mid -= mid % 2
+		if span(mid) == 0:
+			good_n = mid
 		else:
-			low = mid + 1
-	return n_values[high + 1]
+			bad_n = mid
+	return good_n
 
 
-def convergence_rate(method):
+def convergence_rate(method, n=None):
 	"""Returns the convergence order of a numerical integration method.
 
 	    Args:
-	        method (callable): left_rectangle, right_rectangle, trapezoidal, or simpson_rule.
+	        method (callable): left_rectangle, right_rectangle, trapezoidal,
+	            simpson_rule, romberg or gauss_legendre.
+	        n (int): Number of subintervals. Romberg reaches full order
+	            only for n divisible by 2 ** (ROMBERG_LEVELS - 1), with n
+	            the order it actually has is returned (see `romberg_depth`).
 
 	    Raises:
 	        ValueError: If the method is unknown.
 
 	    Returns:
-	        int: Convergence order (2, 3, or 4).
+	        int: Convergence order (2, 3, 4, 2 * ROMBERG_LEVELS or
+	            2 * GAUSS_ORDER).
 	"""
 
 	if method == left_rectangle or method == right_rectangle:
@@ -293,12 +1041,458 @@ def convergence_rate(method):
 		return 3
 	elif method == simpson_rule:
 		return 4
+	elif method == romberg:
+		depth = ROMBERG_LEVELS - 1 if n is None else romberg_depth(n)
+		return 2 * (depth + 1)
+	elif method == gauss_legendre:
+		return 2 * GAUSS_ORDER
 	else:
 		raise ValueError("Unknown integration method")
 
-def runge_rule(method, func, a, b, n_start, tolerance):
+def error_expansion(method, n=None):
+	"""Returns (order, step) of the asymptotic error expansion
+	C1*h^order + C2*h^(order+step) + ... of a method, used by the
+	Richardson extrapolation in `runge_rule`.
+
+	    Notes:
+	        - Unlike `convergence_rate`, these are the true orders:
+	          rectangles are first order, the trapezoidal rule second.
+	        - n matters only for Romberg, as in `convergence_rate`.
+
+	    Raises:
+	        ValueError: If the method is unknown.
+	"""
+	if method == left_rectangle or method == right_rectangle:
+		return 1, 1
+	elif method == trapezoidal:
+		return 2, 2
+	elif method == simpson_rule:
+		return 4, 2
+	elif method == romberg:
+		return convergence_rate(romberg, n), 2
+	elif method == gauss_legendre:
+		return 2 * GAUSS_ORDER, 2
+	else:
+		raise ValueError("Unknown integration method")
+
+def richardson_row(prev_row, value, order, step, levels):
+	"""
+	    Builds the next row of the Richardson table.
+
+	    Column j of a row removes the first j terms of the error
+	    expansion; the row for the finest grid is computed from the new
+	    raw value and the previous row only, so the whole table is never
+	    stored.
+
+	    Args:
+	        prev_row (list): Previous row ([] for the first grid).
+	        value (float): Approximation on the grid twice finer than
+	            the one of prev_row.
+	        order (int), step (int): See `error_expansion`.
+	        levels (int): Maximum number of extrapolation columns.
+
+	    Returns:
+	        list: New row, value first, the most extrapolated last.
+	"""
+	row = [value]
+	for j in range(1, min(len(prev_row), levels) + 1):
+		factor = 2 ** (order + (j - 1) * step) - 1
+		row.append(row[j - 1] + (row[j - 1] - prev_row[j - 1]) / factor)
+	return row
+
+class NestedGrid:
+	"""Running sums of function values on a uniform grid that is refined
+	by halving the stride.
+
+	Every refinement evaluates func only at the new midpoints: the old
+	interior points keep their values and just become even-indexed points
+	of the finer grid. Rectangle, trapezoidal and Simpson estimates are
+	assembled from the sums without resampling.
+
+	Sums of every level are kept, so estimates for coarser levels stay
+	available after refinement. `refine_to` is thread-safe, which lets
+	several Runge loops share one grid. A grid created with lazy=True
+	samples func only on the first `refine_to`, so loops whose results
+	are all cached don't evaluate anything.
+
+	Args:
+	    func (callable): Function to integrate.
+	    a (float): Lower limit of integration.
+	    b (float): Upper limit of integration.
+	    n (int): Initial number of subintervals.
+	    block_size (int or None): Points evaluated at once, None to
+	        evaluate the whole grid in memory.
+	    workers (int): Threads evaluating blocks in parallel.
+	    lazy (bool): Postpone sampling until the first `refine_to`.
+	"""
+
+	def __init__(self, func, a, b, n, block_size=BLOCK_SIZE, workers=1,
+	             lazy=False):
+		self.func = func
+		self.a = a
+		self.b = b
+		self.n = n
+		self.block_size = block_size
+		self.workers = workers
+		self.levels = {}
+		self.lock = threading.Lock()
+		if not lazy:
+			self.sample()
+
+	def sample(self):
+		"""Evaluates func on the initial grid."""
+		n = self.n
+		odd_sum = Accumulator()
+		even_sum = Accumulator()
+		blocks = eval_blocks(self.func, self.a, self.b, n, 0, n,
+		                     self.block_size, self.workers)
+		for i0, func_arr in blocks:
+			if i0 == 0:
+				self.f_a = func_arr[0]
+			odd_arr, even_arr = inner_parity(i0, n, func_arr)
+			odd_sum.add(odd_arr)
+			even_sum.add(even_arr)
+		self.f_b = func_arr[-1]
+		self.odd_sum = odd_sum.value
+		self.even_sum = even_sum.value
+		self.levels[n] = (self.odd_sum, self.even_sum)
+
+	@property
+	def stride(self):
+		return (self.b - self.a) / self.n
+
+	def refine(self):
+		"""Doubles the number of subintervals, sampling only the midpoints."""
+		n = 2 * self.n
+		stride = (self.b - self.a) / n
+		odd_sum = Accumulator()
+		for _, func_arr in map_blocks(self.func, self.midpoint_blocks(stride),
+		                              self.workers):
+			odd_sum.add(func_arr)
+		self.even_sum = self.even_sum + self.odd_sum
+		self.odd_sum = odd_sum.value
+		self.n = n
+		self.levels[n] = (self.odd_sum, self.even_sum)
+
+	def refine_to(self, n):
+		"""Refines the grid until it has at least n subintervals."""
+		with self.lock:
+			if not self.levels:
+				self.sample()
+			while self.n < n:
+				self.refine()
+
+	def midpoint_blocks(self, stride):
+		"""Yields blocks of points 1, 3, ..., 2n-1 of the refined grid."""
+		block_size = self.block_size or self.n
+		for k0 in range(0, self.n, block_size):
+			k1 = min(k0 + block_size, self.n)
+			x_arr = (2 * np.arange(k0, k1, dtype='float64') + 1) * stride + \
+				self.a
+			yield k0, x_arr
+
+	def estimate(self, method, n=None):
+		"""Returns the approximation of `method` on the level with n
+		subintervals (the current one by default).
+
+		    Raises:
+		        EvenStepWarning: If Simpson is requested for odd n.
+		        ValueError: If the method is unknown.
+		"""
+		if n is None:
+			n = self.n
+		return round_result(self.value(method, n))
+
+	def value(self, method, n):
+		"""Same as `estimate` for level n, but not rounded."""
+		odd_sum, even_sum = self.levels[n]
+		stride = (self.b - self.a) / n
+		inner_sum = odd_sum + even_sum
+		if method == left_rectangle:
+			result = stride * (self.f_a + inner_sum)
+		elif method == right_rectangle:
+			result = stride * (inner_sum + self.f_b)
+		elif method == trapezoidal:
+			result = stride * ((self.f_a + self.f_b) / 2 + inner_sum)
+		elif method == simpson_rule:
+			if not n % 2 == 0:
+				raise EvenStepWarning('Simpson rule is only implemented for'
+				                      ' even number of subintervals.')
+			result = stride / 3 * (self.f_a + 4 * odd_sum +
+			                       2 * even_sum + self.f_b)
+		else:
+			raise ValueError("Unknown integration method")
+		return result
+
+	# Методы, которые собираются из сумм сетки без новых вычислений func
+	METHODS = (left_rectangle, right_rectangle, trapezoidal, simpson_rule)
+
+# Число уровней таблицы Ромберга: трапеции на n, n/2, n/4, n/8
+ROMBERG_LEVELS = 4
+
+def romberg(func, a, b, n, block_size=BLOCK_SIZE, workers=1):
+	"""
+	    Computes the definite integral by Romberg extrapolation of
+	    trapezoidal sums on n, n/2, n/4, ... subintervals.
+
+	    Notes:
+	        - The sums come from one `NestedGrid`, so func is evaluated
+	          on n+1 points only, as for the trapezoidal rule.
+	        - Full order 2 * ROMBERG_LEVELS needs n divisible by
+	          2 ** (ROMBERG_LEVELS - 1); otherwise fewer levels are used
+	          (odd n gives the plain trapezoidal rule).
+
+	    Args:
+	        func (callable): Function to integrate.
+	        a (float): Lower limit of integration.
+	        b (float): Upper limit of integration.
+	        n (int): Number of subintervals of the finest level.
+	        block_size (int or None): Points evaluated at once, None to
+	            evaluate the whole grid in memory.
+	        workers (int): Threads evaluating blocks in parallel.
+
+	    Returns:
+	        float: Approximation of the integral.
+	"""
+	a, b, n = validate_input(a, b, n)
+
+	key = cache_key(func, a, b, n, 'romberg')
+	cached = results_cache.get(key)
+	if cached is not None:
+		return cached
+
+	depth = romberg_depth(n)
+	grid = NestedGrid(func, a, b, n >> depth, block_size, workers)
+	grid.refine_to(n)
+	result = round_result(romberg_table(
+		[grid.value(trapezoidal, n >> level) for level in range(depth + 1)]
+	))
+	results_cache.put(key, result)
+	return result
+
+def romberg_depth(n):
+	"""Returns how many times n can be halved for the Romberg table,
+	at most ROMBERG_LEVELS - 1."""
+	depth = 0
+	while depth < ROMBERG_LEVELS - 1 and n % 2 ** (depth + 1) == 0:
+		depth += 1
+	return depth
+
+def romberg_table(trapezoids):
+	"""
+	    Extrapolates trapezoidal sums on n, n/2, n/4, ... subintervals
+	    (finest first) to the last element of the Romberg table.
+	"""
+	# Строка таблицы от грубого уровня к мелкому; каждый проход
+	# исключает следующий член разложения ошибки по h^2
+	row = trapezoids[::-1]
+	for k in range(1, len(row)):
+		row = [(4 ** k * fine - coarse) / (4 ** k - 1)
+		       for coarse, fine in zip(row, row[1:])]
+	return row[0]
+
+# Число узлов Гаусса–Лежандра на каждом подынтервале
+GAUSS_ORDER = 5
+
+@lru_cache(maxsize=None)
+def gauss_nodes(order):
+	"""Returns read-only (nodes, weights) of the Gauss–Legendre rule
+	with `order` points on [-1, 1]."""
+	nodes, weights = np.polynomial.legendre.leggauss(order)
+	nodes.flags.writeable = False
+	weights.flags.writeable = False
+	return nodes, weights
+
+def subinterval_blocks(a, b, n, nodes, block_size=BLOCK_SIZE):
+	"""
+	    Yields (k0, x_arr) where x_arr has shape (subintervals, len(nodes))
+	    and holds `nodes`, given on [-1, 1], mapped onto subintervals
+	    k0, k0+1, ... of the uniform grid with n subintervals.
+	"""
+	if block_size is None:
+		per_block = n
+	else:
+		per_block = max(block_size // len(nodes), 1)
+	half = (b - a) / (2 * n)
+	for k0 in range(0, n, per_block):
+		k1 = min(k0 + per_block, n)
+		mid = (2 * np.arange(k0, k1, dtype='float64') + 1) * half + a
+		yield k0, mid[:, None] + half * nodes
+
+def gauss_legendre(func, a, b, n, block_size=BLOCK_SIZE, workers=1,
+                   progress=None):
+	"""
+	    Computes the definite integral with the composite Gauss–Legendre
+	    rule: GAUSS_ORDER nodes on each of n equal subintervals.
+
+	    Notes:
+	        - Exact for polynomials of degree 2 * GAUSS_ORDER - 1, error
+	          is O(h^(2 * GAUSS_ORDER)) for smooth functions.
+	        - func is never evaluated at a and b, so integrable
+	          singularities at the ends don't raise DomainError.
+	        - Nodes and weights are computed once per order.
+
+	    Args:
+	        func (callable): Function to integrate.
+	        a (float): Lower limit of integration.
+	        b (float): Upper limit of integration.
+	        n (int): Number of subintervals (n * GAUSS_ORDER evaluations).
+	        block_size (int or None): Points evaluated at once, None to
+	            evaluate everything in memory.
+	        workers (int): Threads evaluating blocks in parallel.
+	        progress (callable): Called as progress(subintervals) after
+	            every block, may raise CalculationCancelled.
+
+	    Returns:
+	        float: Approximation of the integral.
+	"""
+	a, b, n = validate_input(a, b, n)
+
+	key = cache_key(func, a, b, n, 'gauss_legendre')
+	cached = results_cache.get(key)
+	if cached is not None:
+		return cached
+
+	nodes, weights = gauss_nodes(GAUSS_ORDER)
+	total = Accumulator()
+	blocks = subinterval_blocks(a, b, n, nodes, block_size)
+	for k0, func_arr in map_blocks(func, blocks, workers):
+		total.add(func_arr @ weights)
+		if progress is not None:
+			progress(k0 + len(func_arr))
+	result = round_result(total.value * (b - a) / (2 * n))
+	results_cache.put(key, result)
+	return result
+
+# Узлы Кронрода (15 точек) и веса правил Кронрода и Гаусса (7 точек,
+# узлы Гаусса — каждый второй узел Кронрода), по QUADPACK
+_KRONROD_HALF = np.array([
+	0.991455371120812639206854697526329,
+	0.949107912342758524526189684047851,
+	0.864864423359769072789712788640926,
+	0.741531185599394439863864773280788,
+	0.586087235467691130294144845693013,
+	0.405845151377397166906606412076961,
+	0.207784955007898467600689403773245,
+])
+_KRONROD_HALF_WEIGHTS = np.array([
+	0.022935322010529224963732008058970,
+	0.063092092629978553290700663189204,
+	0.104790010322250183839876322541518,
+	0.140653259715525918745189590510238,
+	0.169004726639267902826583426598550,
+	0.190350578064785409913256402421014,
+	0.204432940075298892414161999234649,
+])
+_GAUSS_HALF_WEIGHTS = np.array([
+	0.0, 0.129484966168869693270611432679082,
+	0.0, 0.279705391489276667901467771423780,
+	0.0, 0.381830050505118944950369775488975,
+	0.0,
+])
+KRONROD_NODES = np.concatenate((-_KRONROD_HALF, [0.0], _KRONROD_HALF[::-1]))
+KRONROD_WEIGHTS = np.concatenate((
+	_KRONROD_HALF_WEIGHTS, [0.209482141084727828012999174891714],
+	_KRONROD_HALF_WEIGHTS[::-1]
+))
+GAUSS_WEIGHTS = np.concatenate((
+	_GAUSS_HALF_WEIGHTS, [0.417959183673469387755102040816327],
+	_GAUSS_HALF_WEIGHTS[::-1]
+))
+
+def adaptive_gauss_kronrod(func, a, b, tolerance, n=1, max_intervals=10 ** 5,
+                           progress=None):
+	"""
+	    Computes the definite integral with the adaptive Gauss–Kronrod
+	    G7-K15 rule, splitting only subintervals with large error.
+
+	    Notes:
+	        - All active subintervals are evaluated in one call of func,
+	          so every round is a single vectorized pass.
+	        - A subinterval of width w is accepted when |K15 - G7| on it
+	          is below tolerance * w / (b - a); the rest are halved.
+	        - Suits integrands that are steep only in a small part of
+	          [a, b], like function_1 near the edge of its domain.
+
+	    Args:
+	        func (callable): Function to integrate.
+	        a (float): Lower limit.
+	        b (float): Upper limit.
+	        tolerance (float): Desired error tolerance.
+	        n (int): Initial number of equal subintervals.
+	        max_intervals (int): Limit of active subintervals per round.
+	        progress (callable): Called as progress(subintervals,
+	            error_estimate) after every round, may raise
+	            CalculationCancelled.
+
+	    Raises:
+	        RuntimeError: If more than max_intervals subintervals are needed.
+
+	    Returns:
+	        dict: Like `runge_rule`: 'I_n' and 'I_2n' are the Gauss and
+	            Kronrod sums, 'n' is the number of accepted subintervals.
+	"""
+	a, b, n = validate_input(a, b, n)
+	tolerance = validate_tolerance(tolerance)
+
+	if a == b:
+		return {'I_n': round_result(0.0), 'I_2n': round_result(0.0), 'n': n}
+
+	key = cache_key(func, a, b, (n, tolerance), 'adaptive_gauss_kronrod')
+	cached = results_cache.get(key)
+	if cached is not None:
+		return cached
+
+	edges = np.linspace(a, b, n + 1)
+	lo = edges[:-1]
+	hi = edges[1:]
+	gauss_sum = Accumulator()
+	kronrod_sum = Accumulator()
+	accepted = 0
+	while len(lo) > 0:
+		if len(lo) > max_intervals:
+			raise RuntimeError('Adaptive quadrature did not converge.')
+		half = (hi - lo) / 2
+		mid = lo + half
+		func_arr = func(mid[:, None] + half[:, None] * KRONROD_NODES)
+		kronrod = half * (func_arr @ KRONROD_WEIGHTS)
+		gauss = half * (func_arr @ GAUSS_WEIGHTS)
+		done = np.abs(kronrod - gauss) <= \
+			tolerance * 2 * np.abs(half) / abs(b - a)
+
+		gauss_sum.add(gauss[done])
+		kronrod_sum.add(kronrod[done])
+		accepted += int(np.count_nonzero(done))
+		if progress is not None:
+			# Оценка ошибки — по еще не принятым подотрезкам
+			progress(accepted + 2 * int(np.count_nonzero(~done)),
+			         float(np.sum(np.abs(kronrod - gauss)[~done])))
+		lo, mid, hi = lo[~done], mid[~done], hi[~done]
+		lo, hi = np.concatenate((lo, mid)), np.concatenate((mid, hi))
+
+	result = {'I_n': round_result(gauss_sum.value),
+	          'I_2n': round_result(kronrod_sum.value),
+	          'n': accepted}
+	results_cache.put(key, result)
+	return result
+
+def runge_rule(method, func, a, b, n_start, tolerance, incremental=False,
+               workers=1, progress=None, grid=None, extrapolate=False,
+               levels=1):
 	"""Integrates a function using the Runge rule with automatic error control.
 
+	    Notes:
+	        - Every doubling also extends a Richardson table over the
+	          approximations already computed, its best value is
+	          returned as 'richardson' at no extra evaluations.
+	        - With extrapolate=True the loop stops when the same column
+	          of the Richardson table differs by less than tolerance in two
+	          successive rows, which usually takes fewer doublings than the
+	          plain Runge estimate; I_n and I_2n are then those
+	          extrapolated values. On the first doubling the raw I_n and
+	          I_2n are compared as in the plain Runge rule, using the
+	          true order from `error_expansion`.
+
 	    Args:
 	        method (callable): Integration function.
 	        func (callable): Function to integrate.
@@ -306,30 +1500,169 @@ def runge_rule(method, func, a, b, n_start, tolerance):
 	        b (float): Upper limit.
 	        n_start (int): Initial number of subintervals.
 	        tolerance (float): Desired error tolerance.
+	        incremental (bool): Refine a `NestedGrid` instead of resampling
+	            the whole grid on every doubling. Ignored for methods not
+	            in NestedGrid.METHODS.
+	        workers (int): Threads evaluating grid blocks in parallel.
+	        progress (callable): Called as progress(2n, error_estimate)
+	            after every doubling, may raise CalculationCancelled.
+	        grid (NestedGrid): Grid shared with other Runge loops over the
+	            same func, a and b; implies incremental.
+	        extrapolate (bool): Use the extrapolated values as the
+	            convergence criterion.
+	        levels (int): Columns of the Richardson table, 1 is the
+	            classic correction I_2n + (I_2n - I_n) / (2^p - 1).
 
 	    Returns:
-	        tuple: (I_n, I_2n, n) — integral approximations and number of subintervals.
+	        dict: I_n, I_2n, n — integral approximations and number of
+	            subintervals, and richardson — the extrapolated value.
 	"""
 	a, b, n_start = validate_input(a, b, n_start)
 	tolerance = validate_tolerance(tolerance)
+	# stats могут выключить из GUI посреди расчета, берем один раз
+	current_stats = stats
 
 	n = n_start
-	p = convergence_rate(method)
+	order, step = error_expansion(method, n_start)
+	if levels < 1:
+		raise ValueError('Richardson table needs at least one level')
 
 	max_iter = 100
 	iter_count = 0
 
+	if grid is not None:
+		incremental = True
+
+	def estimate(m):
+		nonlocal grid
+		if not incremental or method not in NestedGrid.METHODS:
+			return method(func, a, b, m, workers=workers)
+
+		key = cache_key(func, a, b, m, method.__name__)
+		cached = results_cache.get(key)
+		if cached is not None:
+			return cached
+		# Сетку заводим только при первом промахе кэша
+		if grid is None or grid.n > m and m not in grid.levels:
+			grid = NestedGrid(func, a, b, m, workers=workers)
+		grid.refine_to(m)
+		result = grid.estimate(method, m)
+		results_cache.put(key, result)
+		return result
+
+	I_n = estimate(n)
+	row = richardson_row([], I_n, order, step, levels)
+
 	while True:
-		I_n = method(func, a, b, n)
-		I_2n = method(func, a, b, 2*n)
-		error_estimate = np.abs((I_n - I_2n) / (2 ** p -1))
+		I_2n = estimate(2*n)
+		prev_row = row
+		# У Ромберга порядок растет с n, пока n не делится на
+		# 2^(ROMBERG_LEVELS-1); строки прежнего порядка исключали бы не тот
+		# член разложения, поэтому таблица начинается заново
+		next_order, step = error_expansion(method, 2*n)
+		if next_order != order:
+			order = next_order
+			prev_row = []
+		row = richardson_row(prev_row, I_2n, order, step, levels)
+		column = len(prev_row) - 1
+		if extrapolate and column >= 0:
+			# Сравниваем одну и ту же колонку таблицы двух соседних строк;
+			# на первом удвоении экстраполированного значения еще нет,
+			# тогда это оценка Рунге для I_2n по истинному порядку
+			if column == 0:
+				error_estimate = np.abs(row[1] - row[0])
+			else:
+				error_estimate = np.abs(row[column] - prev_row[column])
+		else:
+			# Порядок Ромберга зависит от n, берем порядок более грубого I_n
+			p = convergence_rate(method, n)
+			error_estimate = np.abs((I_n - I_2n) / (2 ** p -1))
+		if current_stats is not None:
+			with current_stats.lock:
+				current_stats.runge_steps.append((method.__name__, 2*n,
+				                                  error_estimate))
+		if progress is not None:
+			progress(2*n, error_estimate)
 
 		if error_estimate < tolerance:
 			break
 		if iter_count > max_iter:
 			raise RuntimeError('Runge method did not converge.')
 
+		# I_2n этого шага — это I_n следующего, пересчитывать не нужно
 		n = 2*n
+		I_n = I_2n
 		iter_count += 1
 
-	return {'I_n': I_n, 'I_2n': I_2n, 'n': n}
\ No newline at end of file
+	if extrapolate and column >= 0:
+		# Критерий считался по экстраполированным значениям, их и отдаем
+		I_n = round_result(prev_row[column])
+		I_2n = round_result(row[column])
+	return {'I_n': I_n, 'I_2n': I_2n, 'n': n,
+	        'richardson': round_result(row[-1])}
+
+def runge_rule_all(func, a, b, n_start, tolerance, methods=None, workers=None,
+                   block_workers=1, progress=None, done=None,
+                   extrapolate=False, levels=1):
+	"""Runs `runge_rule` for several methods at once.
+
+	    Notes:
+	        - Every method runs in its own thread, all of them refine one
+	          shared `NestedGrid`, so each level is sampled only once and
+	          the total cost is that of the slowest method.
+	        - `done` is called as soon as a method converges, before the
+	          others have finished.
+	        - The grid is sampled only when some method misses
+	          `results_cache`, a fully cached call evaluates nothing.
+
+	    Args:
+	        func (callable): Function to integrate.
+	        a (float): Lower limit.
+	        b (float): Upper limit.
+	        n_start (int): Initial number of subintervals.
+	        tolerance (float): Desired error tolerance.
+	        methods (list): Integration functions, all four rules by default.
+	        workers (int): Threads running the methods, one per method by
+	            default.
+	        block_workers (int): Threads evaluating grid blocks in parallel.
+	        progress (callable): Called as progress(method_name, 2n,
+	            error_estimate), may raise CalculationCancelled.
+	        done (callable): Called as done(method_name, result).
+	        extrapolate (bool), levels (int): See `runge_rule`.
+
+	    Returns:
+	        dict: `runge_rule` results keyed by method name.
+	"""
+	a, b, n_start = validate_input(a, b, n_start)
+	tolerance = validate_tolerance(tolerance)
+	if methods is None:
+		methods = [left_rectangle, right_rectangle, trapezoidal, simpson_rule]
+	if workers is None:
+		workers = len(methods)
+
+	grid = NestedGrid(func, a, b, n_start, workers=block_workers, lazy=True)
+
+	def run(method):
+		report = None
+		if progress is not None:
+			report = lambda n, error: progress(method.__name__, n, error)
+		return runge_rule(method, func, a, b, n_start, tolerance,
+		                  workers=block_workers, progress=report, grid=grid,
+		                  extrapolate=extrapolate, levels=levels)
+
+	results = {}
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		futures = {executor.submit(run, method): method.__name__
+		           for method in methods}
+		for future in as_completed(futures):
+			name = futures[future]
+			results[name] = future.result()
+			if done is not None:
+				done(name, results[name])
+	return {method.__name__: results[method.__name__] for method in methods}
+
+if __name__ == '__main__':
+	# python -m integrals — то же, что python -m numint
+	import sys
+	import numint
+	sys.exit(numint.main())
@@ -0,0 +1,256 @@
+"""
+Interpolation of tabulated data: cubic splines and the Lagrange and
+Newton forms of the interpolation polynomial.
+
+Every interpolant is built once and then evaluated on whole arrays of
+points. Splines are vectorized callables defined on the range of the
+knots, so they can be passed to integrals.trapezoidal, simpson_rule,
+etc. like the example functions.
+"""
+import numpy as np
+
+from integrals import BLOCK_SIZE, DomainError
+
+
+class InterpolationError(Exception):
+	"""Raised when knots can't be interpolated (repeated x, too few)."""
+	pass
+
+def validate_knots(x_arr, y_arr, min_count=1):
+	"""
+	    Converts knots to float arrays sorted by x.
+
+	    Raises:
+	        InterpolationError: If lengths differ, x repeats or there are
+	            fewer than min_count knots.
+	"""
+	x_arr = np.asarray(x_arr, dtype='float64').ravel()
+	y_arr = np.asarray(y_arr, dtype='float64').ravel()
+	if len(x_arr) != len(y_arr):
+		raise InterpolationError('x and y must have the same length')
+	if len(x_arr) < min_count:
+		raise InterpolationError(f'At least {min_count} knots are needed')
+	order = np.argsort(x_arr, kind='stable')
+	x_arr = x_arr[order]
+	y_arr = y_arr[order]
+	if np.any(np.diff(x_arr) == 0):
+		raise InterpolationError('Knots must have distinct x')
+	return x_arr, y_arr
+
+def solve_tridiagonal(lower, diag, upper, rhs):
+	"""
+	    Solves a tridiagonal system by the Thomas algorithm in O(n).
+
+	    Args:
+	        lower (np.ndarray): Subdiagonal, n-1 values.
+	        diag (np.ndarray): Diagonal, n values.
+	        upper (np.ndarray): Superdiagonal, n-1 values.
+	        rhs (np.ndarray): Right-hand side, n values.
+
+	    Returns:
+	        np.ndarray: Solution.
+	"""
+	# Поэлементный доступ к спискам Python быстрее, чем к массивам NumPy
+	lower = lower.tolist()
+	diag = diag.tolist()
+	upper = upper.tolist() + [0.0]
+	rhs = rhs.tolist()
+	n = len(diag)
+
+	c_prime = [0.0] * n
+	d_prime = [0.0] * n
+	c_last = 0.0
+	d_last = 0.0
+	for i in range(n):
+		l_i = lower[i - 1] if i > 0 else 0.0
+		denominator = diag[i] - l_i * c_last
+		c_last = c_prime[i] = upper[i] / denominator
+		d_last = d_prime[i] = (rhs[i] - l_i * d_last) / denominator
+
+	solution = [0.0] * n
+	solution[-1] = d_prime[-1]
+	for i in range(n - 2, -1, -1):
+		solution[i] = d_prime[i] - c_prime[i] * solution[i + 1]
+	return np.array(solution)
+
+
+class CubicSpline:
+	"""
+	    Interpolating cubic spline.
+
+	    Coefficients of all pieces are kept in one contiguous (4, n-1)
+	    array in Horner order; evaluation finds pieces for all points
+	    with one np.searchsorted call.
+
+	    Args:
+	        x_arr (array-like): Knots, sorted automatically.
+	        y_arr (array-like): Values at the knots.
+	        boundary (str): 'natural' (zero second derivative at the
+	            ends) or 'clamped' (given first derivative).
+	        slopes (tuple): (f'(x_0), f'(x_n)) for the clamped spline.
+
+	    Raises:
+	        InterpolationError: For bad knots or unknown boundary.
+	"""
+
+	def __init__(self, x_arr, y_arr, boundary='natural', slopes=None):
+		self.x_arr, self.y_arr = validate_knots(x_arr, y_arr, 2)
+		self.boundary = boundary
+		if boundary == 'clamped' and slopes is None:
+			raise InterpolationError('Clamped spline needs end slopes')
+		if boundary not in ('natural', 'clamped'):
+			raise InterpolationError(f'Unknown boundary: {boundary}')
+		self.slopes = slopes
+		self.coefficients = self.make_coefficients()
+
+	def __repr__(self):
+		return f'CubicSpline({len(self.x_arr)} knots, {self.boundary})'
+
+	@property
+	def a(self):
+		return self.x_arr[0]
+
+	@property
+	def b(self):
+		return self.x_arr[-1]
+
+	def second_derivatives(self, h, slope):
+		"""Solves the tridiagonal system for second derivatives M_i."""
+		n = len(self.x_arr)
+		diag = np.empty(n)
+		lower = np.empty(n - 1)
+		upper = np.empty(n - 1)
+		rhs = np.empty(n)
+
+		diag[1:-1] = 2 * (h[:-1] + h[1:])
+		lower[:-1] = h[:-1]
+		upper[1:] = h[1:]
+		rhs[1:-1] = 6 * (slope[1:] - slope[:-1])
+
+		if self.boundary == 'natural':
+			diag[0] = diag[-1] = 1.0
+			upper[0] = lower[-1] = 0.0
+			rhs[0] = rhs[-1] = 0.0
+		else:
+			slope_a, slope_b = map(float, self.slopes)
+			diag[0] = 2 * h[0]
+			upper[0] = h[0]
+			rhs[0] = 6 * (slope[0] - slope_a)
+			diag[-1] = 2 * h[-1]
+			lower[-1] = h[-1]
+			rhs[-1] = 6 * (slope_b - slope[-1])
+		return solve_tridiagonal(lower, diag, upper, rhs)
+
+	def make_coefficients(self):
+		h = np.diff(self.x_arr)
+		slope = np.diff(self.y_arr) / h
+		m = self.second_derivatives(h, slope)
+		return np.ascontiguousarray(np.stack([
+			(m[1:] - m[:-1]) / (6 * h),
+			m[:-1] / 2,
+			slope - h * (2 * m[:-1] + m[1:]) / 6,
+			self.y_arr[:-1],
+		]))
+
+	def __call__(self, x_arr):
+		x_arr = np.asarray(x_arr, dtype='float64')
+		if np.any((x_arr < self.a) | (x_arr > self.b)):
+			raise DomainError
+		piece = np.clip(np.searchsorted(self.x_arr, x_arr, side='right') - 1,
+		                0, len(self.x_arr) - 2)
+		t_arr = x_arr - self.x_arr[piece]
+		d, c, b, a = self.coefficients[:, piece]
+		return (((d * t_arr + c) * t_arr + b) * t_arr + a)[()]
+
+	def integral(self):
+		"""Returns the exact integral of the spline over [x_0, x_n]."""
+		h = np.diff(self.x_arr)
+		d, c, b, a = self.coefficients
+		return np.sum(((d * h / 4 + c / 3) * h + b / 2) * h * h + a * h)
+
+
+class NewtonPolynomial:
+	"""
+	    Interpolation polynomial in Newton's form.
+
+	    The divided differences are computed once; `add_knot` extends them
+	    in O(n) using the kept last diagonal of the table, without
+	    recomputing the rest.
+
+	    Args:
+	        x_arr (array-like): Knots.
+	        y_arr (array-like): Values at the knots.
+	"""
+
+	def __init__(self, x_arr, y_arr):
+		x_arr = np.asarray(x_arr, dtype='float64').ravel()
+		validate_knots(x_arr, y_arr, 1)
+		self.x_arr = np.empty(0)
+		self.coefficients = np.empty(0)
+		# Нижняя диагональ таблицы: f[x_n], f[x_n-1, x_n], ..., f[x_0..x_n]
+		self.edge = np.empty(0)
+		for x, y in zip(x_arr, np.asarray(y_arr, dtype='float64').ravel()):
+			self.add_knot(x, y)
+
+	def __repr__(self):
+		return f'NewtonPolynomial(degree={len(self.x_arr) - 1})'
+
+	def add_knot(self, x, y):
+		"""Adds a knot, raising the degree by one."""
+		if np.any(self.x_arr == x):
+			raise InterpolationError('Knots must have distinct x')
+		edge = np.empty(len(self.edge) + 1)
+		edge[0] = y
+		for k in range(1, len(edge)):
+			edge[k] = (edge[k - 1] - self.edge[k - 1]) / (x - self.x_arr[-k])
+		self.edge = edge
+		self.x_arr = np.append(self.x_arr, x)
+		self.coefficients = np.append(self.coefficients, edge[-1])
+
+	def __call__(self, x_arr):
+		x_arr = np.asarray(x_arr, dtype='float64')
+		result = np.full_like(x_arr, self.coefficients[-1])
+		for k in range(len(self.coefficients) - 2, -1, -1):
+			result *= x_arr - self.x_arr[k]
+			result += self.coefficients[k]
+		return result[()]
+
+
+class LagrangePolynomial:
+	"""
+	    Interpolation polynomial in the barycentric Lagrange form.
+
+	    Barycentric weights are computed once in O(n^2); evaluation is
+	    O(n) per point and is done in blocks of points, so memory stays
+	    bounded for millions of points.
+
+	    Args:
+	        x_arr (array-like): Knots.
+	        y_arr (array-like): Values at the knots.
+	"""
+
+	def __init__(self, x_arr, y_arr):
+		self.x_arr, self.y_arr = validate_knots(x_arr, y_arr, 1)
+		differences = self.x_arr[:, None] - self.x_arr[None, :]
+		np.fill_diagonal(differences, 1.0)
+		self.weights = 1 / np.prod(differences, axis=1)
+
+	def __repr__(self):
+		return f'LagrangePolynomial(degree={len(self.x_arr) - 1})'
+
+	def __call__(self, x_arr):
+		x_arr = np.asarray(x_arr, dtype='float64')
+		flat = x_arr.ravel()
+		result = np.empty_like(flat)
+		block = max(BLOCK_SIZE // len(self.x_arr), 1)
+		for i0 in range(0, len(flat), block):
+			points = flat[i0:i0 + block, None]
+			with np.errstate(divide='ignore', invalid='ignore'):
+				terms = self.weights / (points - self.x_arr)
+				values = terms @ self.y_arr / np.sum(terms, axis=1)
+			# В узлах формула дает 0/0, там берем значение узла
+			exact = points == self.x_arr
+			hit = np.any(exact, axis=1)
+			values[hit] = self.y_arr[np.argmax(exact[hit], axis=1)]
+			result[i0:i0 + block] = values
+		return result.reshape(x_arr.shape)[()]
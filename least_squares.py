@@ -0,0 +1,301 @@
+"""
+Least squares (LSM) approximation of data by polynomials.
+
+In-memory data is fitted through the QR decomposition of the design
+matrix, which is numerically stable even for badly conditioned bases.
+Files larger than memory are fitted in one pass: `NormalEquations`
+accumulates XᵀX and Xᵀy chunk by chunk, so memory depends only on the
+number of coefficients.
+"""
+import itertools
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from integrals import EmptyInput, NonNumInput
+
+
+class FitError(Exception):
+	"""Raised when the data doesn't determine the coefficients."""
+	pass
+
+# Строк, читаемых из файла за раз; память на чтение от размера файла
+# не зависит
+CHUNK_ROWS = 2 ** 20
+
+FitResult = namedtuple('FitResult', ['model', 'rows', 'rmse', 'r2',
+                                     'fit_time'])
+
+
+class PolynomialModel:
+	"""
+	    Polynomial sum(c_k * t^k), t = (x - shift) / scale.
+
+	    The shift and scale keep powers of t near [-1, 1], which keeps
+	    the design matrix well conditioned. The model is a vectorized
+	    callable, so it can be plotted and integrated like the example
+	    functions.
+
+	    Args:
+	        coefficients (array-like): c_0 .. c_degree.
+	        shift (float): Subtracted from x.
+	        scale (float): x - shift is divided by it.
+	"""
+
+	def __init__(self, coefficients, shift=0.0, scale=1.0):
+		self.coefficients = np.asarray(coefficients, dtype='float64')
+		self.shift = shift
+		self.scale = scale
+
+	def __repr__(self):
+		return (f'PolynomialModel(degree={self.degree}, '
+		        f'shift={self.shift!r}, scale={self.scale!r})')
+
+	@property
+	def degree(self):
+		return len(self.coefficients) - 1
+
+	def __call__(self, x_arr):
+		t_arr = (np.asarray(x_arr, dtype='float64') - self.shift) / self.scale
+		return np.polynomial.polynomial.polyval(t_arr, self.coefficients)[()]
+
+	def power_coefficients(self):
+		"""Returns coefficients of the same polynomial in powers of x."""
+		t = np.polynomial.Polynomial([-self.shift / self.scale,
+		                              1 / self.scale])
+		return (np.polynomial.Polynomial(self.coefficients)(t)).coef
+
+def validate_degree(degree):
+	if degree == '':
+		raise EmptyInput("You didn't enter degree")
+	try:
+		degree = int(degree)
+	except ValueError:
+		raise NonNumInput('Degree must be an integer')
+	if degree < 0:
+		raise FitError('Degree must be at least 0')
+	return degree
+
+def data_scaling(x_arr):
+	"""Returns (shift, scale) mapping the range of x_arr onto [-1, 1]."""
+	lo, hi = np.min(x_arr), np.max(x_arr)
+	shift = (lo + hi) / 2
+	scale = (hi - lo) / 2
+	return shift, scale if scale > 0 else 1.0
+
+def design_matrix(x_arr, degree, shift=0.0, scale=1.0):
+	"""Returns the (rows x degree+1) matrix of powers t^0 .. t^degree."""
+	return np.vander((x_arr - shift) / scale, degree + 1, increasing=True)
+
+def fit(x_arr, y_arr, degree):
+	"""
+	    Fits a polynomial of the given degree to in-memory data by least
+	    squares, solving R c = Qᵀ y with the QR decomposition.
+
+	    Raises:
+	        FitError: If there are fewer distinct x than coefficients.
+
+	    Args:
+	        x_arr (array-like): Arguments.
+	        y_arr (array-like): Values.
+	        degree (int): Degree of the polynomial.
+
+	    Returns:
+	        FitResult: Model, number of rows, RMSE, R^2 and fit time.
+	"""
+	start = time.perf_counter()
+	degree = validate_degree(degree)
+	x_arr = np.asarray(x_arr, dtype='float64').ravel()
+	y_arr = np.asarray(y_arr, dtype='float64').ravel()
+	if len(np.unique(x_arr)) <= degree:
+		raise FitError('Not enough distinct points for this degree')
+
+	shift, scale = data_scaling(x_arr)
+	q, r = np.linalg.qr(design_matrix(x_arr, degree, shift, scale))
+	coefficients = np.linalg.solve(r, q.T @ y_arr)
+	model = PolynomialModel(coefficients, shift, scale)
+
+	residuals = y_arr - model(x_arr)
+	rss = residuals @ residuals
+	tss = np.sum((y_arr - np.mean(y_arr)) ** 2)
+	return FitResult(model, len(x_arr), np.sqrt(rss / len(x_arr)),
+	                 1 - rss / tss if tss > 0 else 1.0,
+	                 time.perf_counter() - start)
+
+
+class NormalEquations:
+	"""
+	    Running sums XᵀX, Xᵀy and yᵀy of a least squares problem.
+
+	    Rows are added in chunks with `add_rows` (any design matrix) or
+	    `add` (polynomial of x); `solve` can be called at any moment and
+	    more rows added afterwards. Residual statistics come from the same
+	    sums, so the data is read only once.
+
+	    Notes:
+	        - Normal equations square the condition number, so the x range
+	          is mapped onto about [-1, 1] with the shift and scale taken
+	          from the first chunk.
+
+	    Args:
+	        size (int): Number of coefficients (columns of X).
+	"""
+
+	def __init__(self, size):
+		self.size = size
+		self.gram = np.zeros((size, size))
+		self.moment = np.zeros(size)
+		self.yy = 0.0
+		self.y_sum = 0.0
+		self.rows = 0
+		self.shift = None
+		self.scale = None
+
+	def add_rows(self, design, y_arr):
+		"""Adds rows of the design matrix and the matching values."""
+		self.gram += design.T @ design
+		self.moment += design.T @ y_arr
+		self.yy += y_arr @ y_arr
+		self.y_sum += np.sum(y_arr)
+		self.rows += len(y_arr)
+
+	def add(self, x_arr, y_arr):
+		"""Adds points (x, y) for a polynomial of degree size - 1."""
+		x_arr = np.asarray(x_arr, dtype='float64').ravel()
+		y_arr = np.asarray(y_arr, dtype='float64').ravel()
+		if len(x_arr) == 0:
+			return
+		if self.shift is None:
+			self.shift, self.scale = data_scaling(x_arr)
+		self.add_rows(design_matrix(x_arr, self.size - 1, self.shift,
+		                            self.scale), y_arr)
+
+	def coefficients(self):
+		"""
+		    Solves XᵀX c = Xᵀy by the Cholesky decomposition.
+
+		    Raises:
+		        FitError: If XᵀX is singular.
+		"""
+		try:
+			lower = np.linalg.cholesky(self.gram)
+		except np.linalg.LinAlgError:
+			raise FitError('Not enough distinct points for this model')
+		return np.linalg.solve(lower.T, np.linalg.solve(lower, self.moment))
+
+	def residual_stats(self, coefficients):
+		"""Returns (RMSE, R^2) computed from the sums, without the data."""
+		# ||y - Xc||^2 = yᵀy - 2 cᵀXᵀy + cᵀXᵀXc
+		rss = max(self.yy - 2 * coefficients @ self.moment +
+		          coefficients @ self.gram @ coefficients, 0.0)
+		tss = self.yy - self.y_sum ** 2 / self.rows
+		r2 = 1 - rss / tss if tss > 0 else 1.0
+		return np.sqrt(rss / self.rows), r2
+
+	def solve(self):
+		"""Returns a FitResult for the polynomial (fit_time is 0)."""
+		coefficients = self.coefficients()
+		rmse, r2 = self.residual_stats(coefficients)
+		model = PolynomialModel(coefficients, self.shift, self.scale)
+		return FitResult(model, self.rows, rmse, r2, 0.0)
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS, skip_rows=0):
+	"""
+	    Yields the numeric table from a .npy or CSV file as 2-D float
+	    arrays of at most chunk_rows rows.
+
+	    Notes:
+	        - .npy files are memory-mapped, only the current chunk is read.
+	        - A first CSV line that isn't numeric is taken as a header.
+	        - The first skip_rows data rows (header not counted) are
+	          skipped without parsing, e.g. rows already fitted.
+
+	    Raises:
+	        NonNumInput: If a CSV row isn't numeric.
+	"""
+	if str(path).endswith('.npy'):
+		table = np.load(path, mmap_mode='r')
+		if table.ndim == 1:
+			table = table.reshape(-1, 1)
+		for i0 in range(skip_rows, len(table), chunk_rows):
+			yield np.asarray(table[i0:i0 + chunk_rows], dtype='float64')
+		return
+
+	with open(path, encoding='utf-8') as stream:
+		first = stream.readline()
+		try:
+			[float(value) for value in first.split(',')]
+			pending = [first]
+		except ValueError:
+			pending = []
+		if skip_rows:
+			# Пропущенные строки не разбираем, только пересчитываем
+			skip = skip_rows - len(pending)
+			pending = []
+			for _ in itertools.islice(stream, skip):
+				pass
+		while True:
+			lines = pending + list(itertools.islice(stream,
+			                                        chunk_rows - len(pending)))
+			pending = []
+			if not lines:
+				return
+			try:
+				yield np.loadtxt(lines, delimiter=',', ndmin=2)
+			except ValueError:
+				raise NonNumInput('Data file must contain only numbers')
+
+def fit_file(path, degree, x_column=0, y_column=1, chunk_rows=CHUNK_ROWS,
+             progress=None, sample_size=0):
+	"""
+	    Fits a polynomial to columns of a file in one pass by streaming
+	    normal equations.
+
+	    Args:
+	        path (str): .npy or CSV file.
+	        degree (int): Degree of the polynomial.
+	        x_column, y_column (int): Columns with x and y.
+	        chunk_rows (int): Rows read at once.
+	        progress (callable): Called as progress(rows) after every
+	            chunk, may raise CalculationCancelled.
+	        sample_size (int): Up to this many rows are also returned as
+	            an (x, y) sample, every k-th row of the file, e.g. for
+	            plotting.
+
+	    Raises:
+	        EmptyInput: If the file has no rows.
+	        FitError: If a column is missing in the file.
+
+	    Returns:
+	        tuple: (FitResult, (x_sample, y_sample)).
+	"""
+	start = time.perf_counter()
+	degree = validate_degree(degree)
+	equations = NormalEquations(degree + 1)
+	x_sample = np.empty(0)
+	y_sample = np.empty(0)
+	stride = 1
+	for chunk in read_chunks(path, chunk_rows):
+		if max(x_column, y_column) >= chunk.shape[1]:
+			raise FitError(f'Data file has only {chunk.shape[1]} columns')
+		x_arr = chunk[:, x_column]
+		y_arr = chunk[:, y_column]
+		if sample_size:
+			# Берем каждую stride-ю строку файла; когда выборка
+			# переполняется, шаг удваивается и выборка прореживается
+			first = -equations.rows % stride
+			x_sample = np.concatenate((x_sample, x_arr[first::stride]))
+			y_sample = np.concatenate((y_sample, y_arr[first::stride]))
+			while len(x_sample) > sample_size:
+				x_sample = x_sample[::2]
+				y_sample = y_sample[::2]
+				stride *= 2
+		equations.add(x_arr, y_arr)
+		if progress is not None:
+			progress(equations.rows)
+	if equations.rows == 0:
+		raise EmptyInput('Data file is empty')
+
+	result = equations.solve()._replace(fit_time=time.perf_counter() - start)
+	return result, (x_sample, y_sample)
@@ -1,20 +1,109 @@
+import time
+STARTUP_T0 = time.perf_counter()
+
+import sys
 from tkinter import *
 from tkinter import messagebox
-from integrals import DomainError, ZeroDenominatorError, StepError, \
-	EvenStepWarning, EmptyInput, NonNumInput
-from PIL import Image, ImageTk
-import webbrowser
-import integrals
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
+from tkinter import ttk
+import queue
+import threading
+from functools import lru_cache
+
+STARTUP_IMPORTS_DONE = time.perf_counter()
+
+# numpy, matplotlib и PIL нужны только фреймам с вычислениями, поэтому
+# грузятся при первом создании такого фрейма (или заранее в фоне, после
+# того как отрисовался приветственный экран), см. load_heavy_modules
+heavy_modules_loaded = False
+heavy_modules_lock = threading.Lock()
+
+def load_heavy_modules(profile=None):
+	"""Imports numerical and plotting modules into globals of this module.
+
+	    Safe to call from several threads, modules are imported only once.
+
+	    Args:
+	        profile (StartupProfile): Receives import timings if given.
+	"""
+	global heavy_modules_loaded, integrals, expressions, roots, \
+		least_squares, regression, interpolation, ode, DecimatedPlot, Figure, \
+		FigureCanvasTkAgg, Image, ImageTk, DomainError, \
+		ZeroDenominatorError, StepError, EvenStepWarning, EmptyInput, \
+		NonNumInput, CalculationCancelled, ExpressionError, FitError, \
+		InterpolationError
+
+	with heavy_modules_lock:
+		if heavy_modules_loaded:
+			return
+
+		import integrals
+		from integrals import DomainError, ZeroDenominatorError, StepError, \
+			EvenStepWarning, EmptyInput, NonNumInput, CalculationCancelled
+		import expressions
+		from expressions import ExpressionError
+		import roots
+		import least_squares
+		from least_squares import FitError
+		import regression
+		import interpolation
+		from interpolation import InterpolationError
+		import ode
+		if profile is not None:
+			profile.mark('import numpy, integrals')
+
+		from matplotlib.figure import Figure
+		from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+		from plotting import DecimatedPlot
+		if profile is not None:
+			profile.mark('import matplotlib')
+
+		from PIL import Image, ImageTk
+		if profile is not None:
+			profile.mark('import PIL')
+
+		heavy_modules_loaded = True
+
+
+class StartupProfile:
+	"""Timestamps of startup phases, printed with --startup-profile."""
+	def __init__(self):
+		self.marks = [('interpreter -> main.py', STARTUP_T0),
+		              ('import tkinter', STARTUP_IMPORTS_DONE)]
+
+	def mark(self, name):
+		self.marks.append((name, time.perf_counter()))
+
+	def report(self):
+		print(f'{"phase":<26}{"step, ms":>10}{"total, ms":>11}')
+		prev = STARTUP_T0
+		for name, t in self.marks[1:]:
+			print(f'{name:<26}{(t - prev) * 1000:>10.1f}'
+			      f'{(t - STARTUP_T0) * 1000:>11.1f}')
+			prev = t
 
 
 class MainApp:
-	def __init__(self):
+	def __init__(self, profile=None):
+		self.profile = profile
 		self.root = Tk()
 		self.window = MainWindow(self.root)
 		self.root.geometry('800x500')
+		if self.profile is not None:
+			self.profile.mark('build window')
+		self.root.after_idle(self.on_first_paint)
+
+	def on_first_paint(self):
+		self.root.update_idletasks()
+		if self.profile is not None:
+			self.profile.mark('first paint')
+		threading.Thread(target=self.warm_up, daemon=True).start()
+
+	def warm_up(self):
+		load_heavy_modules(self.profile)
+		if self.profile is not None:
+			self.profile.report()
+
+
 	def run(self):
 		self.root.mainloop()
 	def exit_app(self):
@@ -28,6 +117,7 @@ class MainWindow:
 		self.content_frame = Frame(self.root)
 		self.content_frame.pack(expand=True, fill=BOTH)
 		self.current_frame = None
+		self.frames = {}
 		self.switch_to_frame(WelcomeFrame)
 
 	def makeMenu(self):
@@ -43,6 +133,9 @@ class MainWindow:
 		self.method_menu.add_command(label='Аппроксимация',
 		                             command=self.open_approx,
 		                             underline=0)
+		self.method_menu.add_command(label='Множественная регрессия',
+		                             command=self.open_regression,
+		                             underline=0)
 		self.method_menu.add_command(label='Интерполяция',
 		                             command=self.open_interpolation,
 		                             underline=0)
@@ -74,15 +167,20 @@ class MainWindow:
 		                       lambda e: self.github_label.config(fg='black'))
 
 	def switch_to_frame(self, frame_class):
+		# Фреймы создаются один раз и дальше только прячутся, так графики
+		# и картинки не пересоздаются при каждом переключении
 		if self.current_frame is not None:
-			self.current_frame.destroy()
-		self.current_frame = frame_class(self.content_frame, self)
+			self.current_frame.pack_forget()
+		if frame_class not in self.frames:
+			self.frames[frame_class] = frame_class(self.content_frame, self)
+		self.current_frame = self.frames[frame_class]
 		self.current_frame.pack(expand=True, fill=BOTH)
 
 	def open_about(self):
 		AboutWindow(self.root)
 
 	def open_github(self, event):
+		import webbrowser
 		webbrowser.open('https://github.com/toxxiich')
 
 	def open_integrals(self):
@@ -91,6 +189,8 @@ class MainWindow:
 		self.switch_to_frame(RootFindingFrame)
 	def open_approx(self):
 		self.switch_to_frame(ApproximationFrame)
+	def open_regression(self):
+		self.switch_to_frame(RegressionFrame)
 	def open_interpolation(self):
 		self.switch_to_frame(InterpolationFrame)
 	def open_diff_eql(self):
@@ -164,8 +264,201 @@ class WelcomeFrame(Frame):
 		             pady=20)
 		self.welcome_text.pack(expand=True, fill=BOTH)
 
+@lru_cache(maxsize=None)
+def load_photo(path):
+	"""Reads an image from disk once and returns a shared PhotoImage."""
+	return ImageTk.PhotoImage(Image.open(path))
+
+def show_error(error):
+	"""Shows a message box describing an exception from the calculations."""
+	try:
+		raise error
+	except EmptyInput as e:
+		messagebox.showerror(
+			"Ошибка ввода",
+			e
+		)
+
+	except StepError as e:
+		messagebox.showerror(
+			"Ошибка шага",
+			e
+		)
+
+	except ExpressionError as e:
+		messagebox.showerror(
+			"Ошибка в формуле",
+			e
+		)
+
+	except FitError as e:
+		messagebox.showerror(
+			"Ошибка аппроксимации",
+			e
+		)
+
+	except InterpolationError as e:
+		messagebox.showerror(
+			"Ошибка интерполяции",
+			e
+		)
+
+	except FileNotFoundError:
+		messagebox.showerror(
+			"Ошибка ввода",
+			"Файл с данными не найден"
+		)
+
+	except DomainError:
+		messagebox.showerror(
+			"Ошибка области определения",
+			"Функция не определена на данном интервале"
+		)
+
+	except ZeroDenominatorError:
+		messagebox.showerror(
+			"Деление на ноль",
+			"Знаменатель обращается в ноль"
+		)
+
+	except NonNumInput as e:
+		messagebox.showerror(
+			"Ошибка ввода",
+			e
+		)
+
+	except EvenStepWarning as e:
+		messagebox.showerror(
+			'Нечетное разбиение',
+			'Simpson rule requires even n'
+		)
+
+	except Exception as e:
+		messagebox.showerror(
+			"Неизвестная ошибка",
+			f'Упс...\nВы нашли ошибку, которую я не '
+			f'предусмотел!\n\nПожалуйста, напишите о ней на почту нашего '
+			f'разработчика antonsu-spb@yandex.ru и мы обязательно учтем '
+			f'её в следующем релизе!\n\nP.S. Ошибка, с которой вы '
+			f'столкнулись: {e}'
+		)
+
+class BackgroundTask:
+	"""
+	    Runs job(progress) in a worker thread so the window doesn't freeze.
+
+	    The worker never touches Tk: progress reports, the result or the
+	    exception are put into a queue, which the Tk thread polls with
+	    widget.after(). Cancelling is cooperative — the next call of
+	    progress() in the worker raises CalculationCancelled.
+	"""
+	POLL_MS = 50
+
+	def __init__(self, widget, job, on_done, on_error, on_progress):
+		self.widget = widget
+		self.job = job
+		self.on_done = on_done
+		self.on_error = on_error
+		self.on_progress = on_progress
+		self.queue = queue.Queue()
+		self.cancelled = threading.Event()
+		self.thread = threading.Thread(target=self.run, daemon=True)
+		self.thread.start()
+		self.after_id = self.widget.after(self.POLL_MS, self.poll)
+
+	def run(self):
+		try:
+			self.queue.put(('done', self.job(self.report)))
+		except Exception as e:
+			self.queue.put(('error', e))
+
+	def report(self, *args):
+		if self.cancelled.is_set():
+			raise CalculationCancelled
+		self.queue.put(('progress', args))
+
+	def poll(self):
+		while True:
+			try:
+				kind, value = self.queue.get_nowait()
+			except queue.Empty:
+				break
+			if kind == 'progress':
+				self.on_progress(*value)
+			elif kind == 'done':
+				self.on_done(value)
+				return
+			else:
+				self.on_error(value)
+				return
+		self.after_id = self.widget.after(self.POLL_MS, self.poll)
+
+	def cancel(self):
+		self.cancelled.set()
+
+	def stop(self):
+		"""Cancels the job and stops polling, e.g. when the widget dies."""
+		self.cancel()
+		self.widget.after_cancel(self.after_id)
+
+class ProgressPanel(Frame):
+	"""Status line, busy bar and cancel button for one `BackgroundTask`."""
+	def __init__(self, parent):
+		Frame.__init__(self, parent)
+		self.task = None
+		self.status = StringVar()
+		self.bar = ttk.Progressbar(self, mode='indeterminate', length=80)
+		self.bar.pack(side=LEFT, padx=5, pady=5)
+		Label(self, textvariable=self.status).pack(side=LEFT, padx=5, pady=5)
+		self.cancel_button = Button(self, text='Отмена', state=DISABLED,
+		                            command=self.cancel)
+		self.cancel_button.pack(side=RIGHT, padx=5, pady=5)
+
+	def run(self, job, on_done, text):
+		if self.task is not None:
+			return
+
+		def done(result):
+			self.finish('')
+			on_done(result)
+
+		def failed(error):
+			if isinstance(error, CalculationCancelled):
+				self.finish('Отменено')
+			else:
+				self.finish('')
+				show_error(error)
+
+		self.status.set(text)
+		self.bar.start()
+		self.cancel_button.config(state=NORMAL)
+		self.task = BackgroundTask(self, job, done, failed, self.show_progress)
+
+	def show_progress(self, name, n, error=None):
+		if error is None:
+			self.status.set(f'{name}: n = {n}')
+		else:
+			self.status.set(f'{name}: n = {n}, Δ = {error:.3g}')
+
+	def finish(self, text):
+		self.task = None
+		self.bar.stop()
+		self.cancel_button.config(state=DISABLED)
+		self.status.set(text)
+
+	def cancel(self):
+		if self.task is not None:
+			self.task.cancel()
+			self.status.set('Отмена...')
+
+	def destroy(self):
+		if self.task is not None:
+			self.task.stop()
+		Frame.destroy(self)
+
 class IntegralFrame(Frame):
 	def __init__(self, main_frame, main_app):
+		load_heavy_modules()
 		Frame.__init__(self, main_frame)
 		self.main_app = main_app
 		self.make_widgets()
@@ -185,10 +478,8 @@ class IntegralFrame(Frame):
 		self.selected_integral = IntVar()
 		self.selected_integral.set(1)
 
-		self.img1 = Image.open('integral_1.png')
-		self.img2 = Image.open('integral_2.png')
-		self.photo1 = ImageTk.PhotoImage(self.img1)
-		self.photo2 = ImageTk.PhotoImage(self.img2)
+		self.photo1 = load_photo('integral_1.png')
+		self.photo2 = load_photo('integral_2.png')
 
 		Radiobutton(self.pick_integral_frame,
 		                       text='1',
@@ -208,6 +499,17 @@ class IntegralFrame(Frame):
 		Label(self.pick_integral_frame,
 		      image=self.photo2).grid(row=1, column=1, padx=5, pady=5)
 
+		self.expression = StringVar()
+		Radiobutton(self.pick_integral_frame,
+		                       text='f(x) =',
+		                       variable=self.selected_integral,
+		                       value=3).grid(
+			row=2, column=0, padx=5, pady=5
+		)
+		Entry(self.pick_integral_frame, textvariable=self.expression).grid(
+			row=2, column=1, padx=5, pady=5, sticky=EW
+		)
+
 		Label(self.input_num_frame, text='a').grid(row=0, column=0, padx=5, pady=5)
 		Label(self.input_num_frame, text='b').grid(row=1, column=0, padx=5, pady=5)
 		Label(self.input_num_frame, text='n').grid(row=2, column=0, padx=5, pady=5)
@@ -225,15 +527,38 @@ class IntegralFrame(Frame):
 		Button(self.input_num_frame, text='Подбор n',
 		       command=self.find_min_n).grid(row=3, column=1, padx=5, pady=5)
 
+		self.progress_panel = ProgressPanel(self.input_num_frame)
+		self.progress_panel.grid(row=4, column=0, columnspan=2, sticky=EW)
+
+		# Панель отладки: счетчики и время фаз из integrals.stats
+		self.debug = BooleanVar()
+		Checkbutton(self.input_num_frame, text='Отладка',
+		            variable=self.debug, command=self.toggle_debug).grid(
+			row=5, column=0, padx=5, sticky=W
+		)
+		# Гаусс–Лежандр считает функцию еще в GAUSS_ORDER * n точках,
+		# поэтому только по запросу
+		self.with_gauss = BooleanVar()
+		Checkbutton(self.input_num_frame, text='Гаусс–Лежандр',
+		            variable=self.with_gauss).grid(
+			row=5, column=1, padx=5, sticky=W
+		)
+		self.debug_text = StringVar()
+		self.debug_label = Label(self.input_num_frame,
+		                         textvariable=self.debug_text,
+		                         justify=LEFT, font=('Courier', 8))
+
 		self.results = {}
 		self.results['left_rectangle'] = StringVar()
 		self.results['right_rectangle'] = StringVar()
 		self.results['trapezoidal'] = StringVar()
 		self.results['simpson_rule'] = StringVar()
+		self.results['romberg'] = StringVar()
+		self.results['gauss_legendre'] = StringVar()
 		self.results['min_common_step'] = StringVar()
 		self.make_output(self.output_num_frame)
 
-		self.fig = plt.figure(figsize=(5, 4), dpi=100)
+		self.fig = Figure(figsize=(5, 4), dpi=100)
 		self.ax = self.fig.add_subplot(111)
 		self.ax.set_title("Пустой график")
 
@@ -241,110 +566,90 @@ class IntegralFrame(Frame):
 		                                master=self.graph_area_frame)
 		self.canvas.draw()
 		self.canvas.get_tk_widget().pack(expand=True, fill=BOTH)
+		self.plot = DecimatedPlot(self.ax, self.canvas)
 
 	def printer(self):
 		try:
 			params = self.get_input()
-			results = self.calculate_integrals(params)
+		except Exception as e:
+			show_error(e)
+			return
+		# Переменные tkinter читаем здесь, а не в фоновом потоке
+		with_gauss = self.with_gauss.get()
+		self.progress_panel.run(
+			lambda progress: self.calculate_integrals(params, progress,
+			                                          with_gauss),
+			lambda results: self.show_results(params, results),
+			'Вычисление...'
+		)
+
+	def show_results(self, params, results):
+		try:
+			if results['simpson_rule'] is None:
+				results['simpson_rule'] = 'enter even n!!'
+				messagebox.showwarning(
+					'Нечетное разбиение',
+					'Simpson rule requires even n'
+				)
 			self.update_results(results)
 			self.update_plot(params)
-
-		except EmptyInput as e:
-			messagebox.showerror(
-				"Ошибка ввода",
-				e
-			)
-
-		except NonNumInput as e:
-			messagebox.showerror(
-				"Ошибка ввода",
-				e
-			)
-
-		except StepError as e:
-			messagebox.showerror(
-				"Ошибка шага",
-				e
-			)
-
-		except DomainError:
-			messagebox.showerror(
-				"Ошибка области определения",
-				"Функция не определена на данном интервале"
-			)
-
-		except ZeroDenominatorError:
-			messagebox.showerror(
-				"Деление на ноль",
-				"Знаменатель обращается в ноль"
-			)
-
 		except Exception as e:
-			messagebox.showerror(
-				"Неизвестная ошибка",
-				f'Упс...\nВы нашли ошибку, которую я не '
-				f'предусмотел!\n\nПожалуйста, напишите о ней на почту нашего '
-				f'разработчика antonsu-spb@yandex.ru и мы обязательно учтем '
-				f'её в следующем релизе!\n\nP.S. Ошибка, с которой вы '
-				f'столкнулись: {e}'
+			show_error(e)
+		self.show_stats()
+
+	def toggle_debug(self):
+		if self.debug.get():
+			integrals.enable_stats()
+			self.debug_text.set('')
+			self.debug_label.grid(row=6, column=0, columnspan=2,
+			                      padx=5, sticky=W)
+		else:
+			integrals.disable_stats()
+			self.debug_label.grid_remove()
+
+	def show_stats(self):
+		"""Shows what was collected since the last call and starts over."""
+		stats = integrals.stats
+		if stats is not None:
+			self.debug_text.set(stats.report())
+			stats.reset()
+
+	def find_common_step_job(self, params):
+		def job(progress):
+			return integrals.find_common_step(
+				*params,
+				progress=lambda n, span: progress('Подбор n', n, span)
 			)
+		return job
 
 	def find_min_n(self):
 		try:
-			self.results['min_common_step'].set(integrals.find_common_step(
-				*self.get_input()
-			))
-		except EmptyInput as e:
-			messagebox.showerror(
-				"Ошибка ввода",
-				e
-			)
-
-		except StepError as e:
-			messagebox.showerror(
-				"Ошибка шага",
-				e
-			)
-
-		except NonNumInput as e:
-			messagebox.showerror(
-				"Ошибка ввода",
-				e
-			)
-
-		except DomainError:
-			messagebox.showerror(
-				"Ошибка области определения",
-				"Функция не определена на данном интервале"
-			)
-
-		except ZeroDenominatorError:
-			messagebox.showerror(
-				"Деление на ноль",
-				"Знаменатель обращается в ноль"
-			)
-
-		except EvenStepWarning as e:
-			messagebox.showerror(
-				'Нечетное разбиение',
-				'Simpson rule requires even n'
-			)
-
+			params = self.get_input()
 		except Exception as e:
-			messagebox.showerror(
-				"Неизвестная ошибка",
-				f'Упс...\nВы нашли ошибку, которую я не '
-				f'предусмотел!\n\nПожалуйста, напишите о ней на почту нашего '
-				f'разработчика antonsu-spb@yandex.ru и мы обязательно учтем '
-				f'её в следующем релизе!\n\nP.S. Ошибка, с которой вы '
-				f'столкнулись: {e}'
-			)
+			show_error(e)
+			return
+		self.progress_panel.run(self.find_common_step_job(params),
+		                        self.show_min_n, 'Подбор n...')
+
+	def show_min_n(self, n):
+		self.results['min_common_step'].set(n)
+		self.show_stats()
 		Button(self.output_num_frame, text='Проверить nmin',
 		       command=self.check_n).grid(
-			row=5, column=1, padx=5, pady=5
+			row=7, column=1, padx=5, pady=5
 		)
+
 	def check_n(self):
-		self.stride.set(integrals.find_common_step(*self.get_input()))
+		try:
+			params = self.get_input()
+		except Exception as e:
+			show_error(e)
+			return
+		self.progress_panel.run(self.find_common_step_job(params),
+		                        self.apply_n, 'Подбор n...')
+
+	def apply_n(self, n):
+		self.stride.set(n)
 		self.printer()
 
 	def get_input(self):
@@ -356,23 +661,26 @@ class IntegralFrame(Frame):
 			func = integrals.function_1
 		elif self.selected_integral.get() == 2:
 			func = integrals.function_2
+		elif self.selected_integral.get() == 3:
+			func = expressions.compile_expression(self.expression.get())
 
 		return func, a, b, n
 
-	def calculate_integrals(self, input_data):
-		res_dict = {
-			'left_rectangle': integrals.left_rectangle(*input_data),
-			'right_rectangle': integrals.right_rectangle(*input_data),
-			'trapezoidal': integrals.trapezoidal(*input_data),
-		}
-		try:
-			res_dict['simpson_rule'] = integrals.simpson_rule(*input_data)
-		except EvenStepWarning:
-			res_dict['simpson_rule'] = 'enter even n!!'
-			messagebox.showwarning(
-				'Нечетное разбиение',
-				'Simpson rule requires even n'
+	def calculate_integrals(self, input_data, progress=None,
+	                        with_gauss=False):
+		report = None
+		if progress is not None:
+			report = lambda n: progress('Сетка', n)
+		res_dict = integrals.integrate_all(*input_data, progress=report)
+		# Ромберг уже собран integrate_all из той же сетки
+		if with_gauss:
+			if progress is not None:
+				report = lambda n: progress('Гаусс–Лежандр', n)
+			res_dict['gauss_legendre'] = integrals.gauss_legendre(
+				*input_data, progress=report
 			)
+		else:
+			res_dict['gauss_legendre'] = ''
 		return res_dict
 
 
@@ -383,14 +691,8 @@ class IntegralFrame(Frame):
 	def update_plot(self, params):
 		a, b, n = integrals.validate_input(*params[1:])
 		func = params[0]
-		MIN_PLOT_POINTS = 500
-		n = int(n)
-
-		self.ax.clear()
-		x = np.linspace(a, b, max(MIN_PLOT_POINTS, n))
-		y = func(x)
 
-		self.ax.plot(x, y)
+		self.plot.plot(func, a, b)
 		self.canvas.draw()
 
 	def make_output(self, parent):
@@ -406,9 +708,15 @@ class IntegralFrame(Frame):
 		Label(parent, text='Симпсон').grid(
 			row=3, column=0, padx=5, pady=5,
 		)
-		Label(parent, text='Nmin').grid(
+		Label(parent, text='Ромберг').grid(
 			row=4, column=0, padx=5, pady=5,
 		)
+		Label(parent, text='Гаусс–Лежандр').grid(
+			row=5, column=0, padx=5, pady=5,
+		)
+		Label(parent, text='Nmin').grid(
+			row=6, column=0, padx=5, pady=5,
+		)
 		Entry(parent,
 		      textvariable=self.results['left_rectangle'],
 		      state='readonly').grid(
@@ -428,13 +736,21 @@ class IntegralFrame(Frame):
 		      state='readonly').grid(
 			row=3, column=1, padx=5, pady=5
 		)
-		Entry(parent, textvariable=self.results['min_common_step'],
+		Entry(parent, textvariable=self.results['romberg'],
 		      state='readonly').grid(
 			row=4, column=1, padx=5, pady=5
 		)
+		Entry(parent, textvariable=self.results['gauss_legendre'],
+		      state='readonly').grid(
+			row=5, column=1, padx=5, pady=5
+		)
+		Entry(parent, textvariable=self.results['min_common_step'],
+		      state='readonly').grid(
+			row=6, column=1, padx=5, pady=5
+		)
 		Button(parent, text='Метод Рунге',
 		       command=self.main_app.open_runge).grid(
-			row=5, column=0, padx=5, pady=5
+			row=7, column=0, padx=5, pady=5
 		)
 
 
@@ -443,7 +759,18 @@ class IntegralFrame(Frame):
 
 
 class RungeRuleFrame(Frame):
+	METHOD_LABELS = {
+		'left_rectangle': 'S левые',
+		'right_rectangle': 'S правые',
+		'trapezoidal': 'S трап',
+		'simpson_rule': 'S симпс',
+		'romberg': 'S ромберг',
+		'gauss_legendre': 'S гаусс',
+		'adaptive_gauss_kronrod': 'S адапт',
+	}
+
 	def __init__(self, main_frame, main_app):
+		load_heavy_modules()
 		Frame.__init__(self, main_frame)
 		self.main_app = main_app
 		self.make_widgets()
@@ -465,10 +792,8 @@ class RungeRuleFrame(Frame):
 		self.selected_integral = IntVar()
 		self.selected_integral.set(1)
 
-		self.img1 = Image.open('integral_1.png')
-		self.img2 = Image.open('integral_2.png')
-		self.photo1 = ImageTk.PhotoImage(self.img1)
-		self.photo2 = ImageTk.PhotoImage(self.img2)
+		self.photo1 = load_photo('integral_1.png')
+		self.photo2 = load_photo('integral_2.png')
 
 		Radiobutton(self.pick_integral_frame,
 		                       text='1',
@@ -488,6 +813,17 @@ class RungeRuleFrame(Frame):
 		Label(self.pick_integral_frame,
 		      image=self.photo2).grid(row=1, column=1, padx=5, pady=5)
 
+		self.expression = StringVar()
+		Radiobutton(self.pick_integral_frame,
+		                       text='f(x) =',
+		                       variable=self.selected_integral,
+		                       value=3).grid(
+			row=2, column=0, padx=5, pady=5
+		)
+		Entry(self.pick_integral_frame, textvariable=self.expression).grid(
+			row=2, column=1, padx=5, pady=5, sticky=EW
+		)
+
 
 		Label(self.input_num_frame, text='a').grid(row=0, column=0, padx=5, pady=5)
 		Label(self.input_num_frame, text='b').grid(row=1, column=0, padx=5, pady=5)
@@ -509,23 +845,21 @@ class RungeRuleFrame(Frame):
 		Button(self.input_num_frame, text='Запустить ракету',
 		                  command=self.printer).grid(row=4, column=0,
 		                                             padx=5, pady=5)
+		self.extrapolate = BooleanVar()
+		Checkbutton(self.input_num_frame, text='Экстраполяция',
+		            variable=self.extrapolate).grid(row=4, column=1,
+		                                            padx=5, pady=5)
+
+		self.progress_panel = ProgressPanel(self.input_num_frame)
+		self.progress_panel.grid(row=5, column=0, columnspan=2, sticky=EW)
 
 		self.results = {}
-		self.results['left_rectangle_I_n'] = StringVar()
-		self.results['right_rectangle_I_n'] = StringVar()
-		self.results['trapezoidal_I_n'] = StringVar()
-		self.results['simpson_rule_I_n'] = StringVar()
-		self.results['left_rectangle_I_2n'] = StringVar()
-		self.results['right_rectangle_I_2n'] = StringVar()
-		self.results['trapezoidal_I_2n'] = StringVar()
-		self.results['simpson_rule_I_2n'] = StringVar()
-		self.results['left_rectangle_n'] = StringVar()
-		self.results['right_rectangle_n'] = StringVar()
-		self.results['trapezoidal_n'] = StringVar()
-		self.results['simpson_rule_n'] = StringVar()
+		for name in self.METHOD_LABELS:
+			for column in ('_I_n', '_I_2n', '_n', '_richardson'):
+				self.results[name + column] = StringVar()
 		self.make_output(self.output_num_frame)
 
-		self.fig = plt.figure(figsize=(4, 3), dpi=100)
+		self.fig = Figure(figsize=(4, 3), dpi=100)
 		self.ax = self.fig.add_subplot(111)
 		self.ax.set_title("Пустой график")
 
@@ -538,61 +872,29 @@ class RungeRuleFrame(Frame):
 			padx=10,
 			pady=10
 		)
+		self.plot = DecimatedPlot(self.ax, self.canvas)
 
 	def printer(self):
 		try:
 			params = self.get_input()
-			results = self.calculate_integrals(params)
+		except Exception as e:
+			show_error(e)
+			return
+		# Переменные tkinter читаем здесь, а не в фоновом потоке
+		extrapolate = self.extrapolate.get()
+		self.progress_panel.run(
+			lambda progress: self.calculate_integrals(params, progress,
+			                                          extrapolate),
+			lambda results: self.show_results(params, results),
+			'Метод Рунге...'
+		)
+
+	def show_results(self, params, results):
+		try:
 			self.update_results(results)
 			self.update_plot(params)
-
-
-		except EmptyInput as e:
-			messagebox.showerror(
-				"Ошибка ввода",
-				e
-			)
-
-		except StepError as e:
-			messagebox.showerror(
-				"Ошибка шага",
-				e
-			)
-
-		except DomainError:
-			messagebox.showerror(
-				"Ошибка области определения",
-				"Функция не определена на данном интервале"
-			)
-
-		except ZeroDenominatorError:
-			messagebox.showerror(
-				"Деление на ноль",
-				"Знаменатель обращается в ноль"
-			)
-
-		except NonNumInput as e:
-			messagebox.showerror(
-				"Ошибка ввода",
-				e
-			)
-
-		except EvenStepWarning as e:
-			messagebox.showerror(
-				'Нечетное разбиение',
-				'Simpson rule requires even n'
-			)
-
 		except Exception as e:
-			messagebox.showerror(
-				"Неизвестная ошибка",
-				f'Упс...\nВы нашли ошибку, которую я не '
-				f'предусмотел!\n\nПожалуйста, напишите о ней на почту нашего '
-				f'разработчика antonsu-spb@yandex.ru и мы обязательно учтем '
-				f'её в следующем релизе!\n\nP.S. Ошибка, с которой вы '
-				f'столкнулись: {e}'
-			)
-
+			show_error(e)
 
 	def get_input(self):
 		a = self.lower.get()
@@ -604,43 +906,52 @@ class RungeRuleFrame(Frame):
 			func = integrals.function_1
 		elif self.selected_integral.get() == 2:
 			func = integrals.function_2
+		elif self.selected_integral.get() == 3:
+			func = expressions.compile_expression(self.expression.get())
 
 		return func, a, b, n, tolerance
 
-	def calculate_integrals(self, input_data):
-		return {
-			'left_rectangle': integrals.runge_rule(
-				integrals.left_rectangle, *input_data
-			),
-			'right_rectangle': integrals.runge_rule(
-				integrals.right_rectangle, *input_data
-			),
-			'trapezoidal': integrals.runge_rule(
-				integrals.trapezoidal, *input_data
-			),
-			'simpson_rule': integrals.runge_rule(
-				integrals.simpson_rule, *input_data
-			),
-		}
+	def calculate_integrals(self, input_data, progress=None,
+	                        extrapolate=False):
+		report = None
+		if progress is not None:
+			report = lambda name, n, error: progress(
+				self.METHOD_LABELS[name], n, error
+			)
+		results = integrals.runge_rule_all(
+			*input_data, progress=report,
+			methods=[integrals.left_rectangle, integrals.right_rectangle,
+			         integrals.trapezoidal, integrals.simpson_rule,
+			         integrals.romberg, integrals.gauss_legendre],
+			extrapolate=extrapolate
+		)
+		# Адаптивному методу n — только начальное разбиение, Рунге ему не нужен
+		func, a, b, n, tolerance = input_data
+		report = None
+		if progress is not None:
+			report = lambda n, error: progress(
+				self.METHOD_LABELS['adaptive_gauss_kronrod'], n, error
+			)
+		results['adaptive_gauss_kronrod'] = \
+			integrals.adaptive_gauss_kronrod(func, a, b, tolerance, n,
+			                                 progress=report)
+		return results
 
 	def update_results(self, results: dict):
 		for key in results:
 			self.results[key + '_I_n'].set(results[key]['I_n'])
 			self.results[key + '_I_2n'].set(results[key]['I_2n'])
 			self.results[key + '_n'].set(results[key]['n'])
+			self.results[key + '_richardson'].set(
+				results[key].get('richardson', '')
+			)
 
 	def update_plot(self, params):
 		a, b, n, _ = params[1:]
 		a, b, n = integrals.validate_input(a, b, n)
 		func = params[0]
-		MIN_PLOT_POINTS = 500
-		n = max(MIN_PLOT_POINTS, n)
 
-		self.ax.clear()
-		x = np.linspace(a, b, n)
-		y = func(x)
-
-		self.ax.plot(x, y)
+		self.plot.plot(func, a, b)
 		self.canvas.draw()
 
 	def make_output(self, parent):
@@ -665,6 +976,15 @@ class RungeRuleFrame(Frame):
 		Label(parent, text='n').grid(
 			row=0, column=3, padx=5, pady=5,
 		)
+		Label(parent, text='Ричардсон').grid(
+			row=0, column=4, padx=5, pady=5,
+		)
+		for row, name in enumerate(['left_rectangle', 'right_rectangle',
+		                            'trapezoidal', 'simpson_rule'], 1):
+			Entry(parent, textvariable=self.results[name + '_richardson'],
+			      state='readonly').grid(
+				row=row, column=4, padx=5, pady=5
+			)
 		Entry(parent,
 		      textvariable=self.results['left_rectangle_I_n'],
 		      state='readonly').grid(
@@ -724,51 +1044,672 @@ class RungeRuleFrame(Frame):
 		      state='readonly').grid(
 			row=4, column=3, padx=5, pady=5
 		)
+
+		for row, name in enumerate(['romberg', 'gauss_legendre',
+		                            'adaptive_gauss_kronrod'], 5):
+			Label(parent, text=self.METHOD_LABELS[name]).grid(
+				row=row, column=0, padx=5, pady=5
+			)
+			for column, suffix in enumerate(['_I_n', '_I_2n', '_n',
+			                                 '_richardson'], 1):
+				Entry(parent, textvariable=self.results[name + suffix],
+				      state='readonly').grid(
+					row=row, column=column, padx=5, pady=5
+				)
 		Button(parent, text='< назад', fg='red',
 		       command=self.main_app.open_integrals).grid(
-			row=4, column=4, padx=5, pady=5
+			row=7, column=5, padx=5, pady=5
 		)
 
 class RootFindingFrame(Frame):
 	def __init__(self, main_frame, main_app):
+		load_heavy_modules()
 		Frame.__init__(self, main_frame)
-		self.make_widgets()
 		self.main_app = main_app
+		self.make_widgets()
+
 	def make_widgets(self):
-		self.test_text = Label(self, text="Here'll be some Nonlinear "
-		                                  "Equations stuff")
-		self.test_text.pack(expand=True, fill=BOTH)
+		self.input_area_frame = Frame(self)
+		self.graph_area_frame = Frame(self)
+		self.pick_function_frame = Frame(self.input_area_frame)
+		self.input_num_frame = Frame(self.input_area_frame)
+		self.output_num_frame = Frame(self.input_area_frame)
+		self.input_area_frame.pack(side=LEFT, expand=True, fill=BOTH)
+		self.graph_area_frame.pack(side=RIGHT, expand=True, fill=BOTH)
+		self.pick_function_frame.pack(side=TOP, fill=X)
+		self.input_num_frame.pack(side=TOP, fill=X)
+		self.output_num_frame.pack(side=TOP, expand=True, fill=BOTH)
+
+		self.selected_function = IntVar()
+		self.selected_function.set(2)
+		Radiobutton(self.pick_function_frame, text='Функция 1',
+		            variable=self.selected_function, value=1).grid(
+			row=0, column=0, padx=5, pady=5, sticky=W
+		)
+		Radiobutton(self.pick_function_frame, text='Функция 2',
+		            variable=self.selected_function, value=2).grid(
+			row=1, column=0, padx=5, pady=5, sticky=W
+		)
+		self.expression = StringVar()
+		Radiobutton(self.pick_function_frame, text='f(x) =',
+		            variable=self.selected_function, value=3).grid(
+			row=2, column=0, padx=5, pady=5, sticky=W
+		)
+		Entry(self.pick_function_frame, textvariable=self.expression).grid(
+			row=2, column=1, padx=5, pady=5, sticky=EW
+		)
+
+		Label(self.input_num_frame, text='a').grid(row=0, column=0, padx=5, pady=5)
+		Label(self.input_num_frame, text='b').grid(row=1, column=0, padx=5, pady=5)
+		Label(self.input_num_frame, text='n').grid(row=2, column=0, padx=5, pady=5)
+		Label(self.input_num_frame, text='Точность').grid(row=3, column=0, padx=5, pady=5)
+
+		self.lower = StringVar()
+		self.upper = StringVar()
+		self.stride = StringVar(value='1000')
+		self.tolerance = StringVar(value='1e-10')
+
+		Entry(self.input_num_frame, textvariable=self.lower).grid(row=0, column=1, padx=5, pady=5)
+		Entry(self.input_num_frame, textvariable=self.upper).grid(row=1, column=1, padx=5, pady=5)
+		Entry(self.input_num_frame, textvariable=self.stride).grid(row=2, column=1, padx=5, pady=5)
+		Entry(self.input_num_frame, textvariable=self.tolerance).grid(row=3, column=1, padx=5, pady=5)
+
+		self.method = StringVar(value='brent')
+		Radiobutton(self.input_num_frame, text='Метод Брента',
+		            variable=self.method, value='brent').grid(
+			row=4, column=0, padx=5, pady=5, sticky=W
+		)
+		Radiobutton(self.input_num_frame, text='Дихотомия',
+		            variable=self.method, value='bisection').grid(
+			row=4, column=1, padx=5, pady=5, sticky=W
+		)
+		Button(self.input_num_frame, text='Найти корни',
+		       command=self.printer).grid(row=5, column=0, padx=5, pady=5)
+
+		self.count = StringVar()
+		Label(self.output_num_frame, textvariable=self.count).pack(
+			side=TOP, anchor=W, padx=5
+		)
+		scrollbar = Scrollbar(self.output_num_frame)
+		scrollbar.pack(side=RIGHT, fill=Y)
+		self.roots_list = Listbox(self.output_num_frame,
+		                          yscrollcommand=scrollbar.set)
+		self.roots_list.pack(side=LEFT, expand=True, fill=BOTH, padx=5)
+		scrollbar.config(command=self.roots_list.yview)
+
+		self.fig = Figure(figsize=(5, 4), dpi=100)
+		self.ax = self.fig.add_subplot(111)
+		self.ax.set_title("Пустой график")
+
+		self.canvas = FigureCanvasTkAgg(self.fig,
+		                                master=self.graph_area_frame)
+		self.canvas.draw()
+		self.canvas.get_tk_widget().pack(expand=True, fill=BOTH)
+		self.plot = DecimatedPlot(self.ax, self.canvas)
+
+	def printer(self):
+		try:
+			params = self.get_input()
+			found = roots.find_roots(*params, method=self.method.get())
+			self.update_results(found)
+			self.update_plot(params, found)
+
+		except Exception as e:
+			show_error(e)
+
+	def get_input(self):
+		a = self.lower.get()
+		b = self.upper.get()
+		n = self.stride.get()
+		tolerance = self.tolerance.get()
+
+		if self.selected_function.get() == 1:
+			func = integrals.function_1
+		elif self.selected_function.get() == 2:
+			func = integrals.function_2
+		elif self.selected_function.get() == 3:
+			func = expressions.compile_expression(self.expression.get())
+
+		return func, a, b, n, tolerance
+
+	def update_results(self, found):
+		self.count.set(f'Найдено корней: {len(found)}')
+		self.roots_list.delete(0, END)
+		# Listbox на тысячах строк тормозит, показываем начало списка
+		for x in found[:1000]:
+			self.roots_list.insert(END, f'{x:.12g}')
+		if len(found) > 1000:
+			self.roots_list.insert(END, f'... еще {len(found) - 1000}')
+
+	def update_plot(self, params, found):
+		a, b, n = integrals.validate_input(*params[1:4])
+		func = params[0]
+
+		self.plot.plot(func, a, b)
+		self.ax.axhline(0, color='gray', linewidth=0.8)
+		self.ax.plot(found, [0] * len(found), 'o', color='red',
+		             markersize=3)
+		self.canvas.draw()
 
 class ApproximationFrame(Frame):
+	# Сколько точек данных рисуется поверх кривой
+	SAMPLE_SIZE = 5000
+
 	def __init__(self, main_frame, main_app):
+		load_heavy_modules()
 		Frame.__init__(self, main_frame)
+		self.main_app = main_app
 		self.make_widgets()
+
+	def make_widgets(self):
+		self.input_area_frame = Frame(self)
+		self.graph_area_frame = Frame(self)
+		self.input_num_frame = Frame(self.input_area_frame)
+		self.output_num_frame = Frame(self.input_area_frame)
+		self.input_area_frame.pack(side=LEFT, expand=True, fill=BOTH)
+		self.graph_area_frame.pack(side=RIGHT, expand=True, fill=BOTH)
+		self.input_num_frame.pack(side=TOP, fill=X)
+		self.output_num_frame.pack(side=TOP, expand=True, fill=BOTH)
+
+		Label(self.input_num_frame, text='Файл (.csv, .npy)').grid(
+			row=0, column=0, padx=5, pady=5
+		)
+		Label(self.input_num_frame, text='Степень').grid(
+			row=1, column=0, padx=5, pady=5
+		)
+
+		self.path = StringVar()
+		self.degree = StringVar(value='1')
+
+		Entry(self.input_num_frame, textvariable=self.path).grid(
+			row=0, column=1, padx=5, pady=5
+		)
+		Button(self.input_num_frame, text='Обзор...',
+		       command=self.browse).grid(row=0, column=2, padx=5, pady=5)
+		Entry(self.input_num_frame, textvariable=self.degree).grid(
+			row=1, column=1, padx=5, pady=5
+		)
+		Button(self.input_num_frame, text='Аппроксимировать',
+		       command=self.printer).grid(row=2, column=0, padx=5, pady=5)
+
+		self.progress_panel = ProgressPanel(self.input_num_frame)
+		self.progress_panel.grid(row=3, column=0, columnspan=3, sticky=EW)
+
+		self.results = {}
+		self.results['coefficients'] = StringVar()
+		self.results['rows'] = StringVar()
+		self.results['rmse'] = StringVar()
+		self.results['r2'] = StringVar()
+		self.results['fit_time'] = StringVar()
+		self.make_output(self.output_num_frame)
+
+		self.fig = Figure(figsize=(5, 4), dpi=100)
+		self.ax = self.fig.add_subplot(111)
+		self.ax.set_title("Пустой график")
+
+		self.canvas = FigureCanvasTkAgg(self.fig,
+		                                master=self.graph_area_frame)
+		self.canvas.draw()
+		self.canvas.get_tk_widget().pack(expand=True, fill=BOTH)
+		self.plot = DecimatedPlot(self.ax, self.canvas)
+
+	def browse(self):
+		from tkinter import filedialog
+		path = filedialog.askopenfilename(
+			filetypes=[('Данные', '*.csv *.npy'), ('Все файлы', '*')]
+		)
+		if path:
+			self.path.set(path)
+
+	def printer(self):
+		path = self.path.get()
+		degree = self.degree.get()
+		if path == '':
+			show_error(EmptyInput("You didn't choose data file"))
+			return
+
+		def job(progress):
+			return least_squares.fit_file(
+				path, degree, sample_size=self.SAMPLE_SIZE,
+				progress=lambda rows: progress('МНК', rows)
+			)
+
+		self.progress_panel.run(job, self.show_results, 'Чтение данных...')
+
+	def show_results(self, outcome):
+		result, sample = outcome
+		coefficients = result.model.power_coefficients()
+		self.results['coefficients'].set(
+			', '.join(f'{c:.6g}' for c in coefficients)
+		)
+		self.results['rows'].set(result.rows)
+		self.results['rmse'].set(f'{result.rmse:.6g}')
+		self.results['r2'].set(f'{result.r2:.6f}')
+		self.results['fit_time'].set(f'{result.fit_time:.3f} с')
+		self.update_plot(result.model, sample)
+
+	def update_plot(self, model, sample):
+		x_sample, y_sample = sample
+		a, b = x_sample.min(), x_sample.max()
+		if a == b:
+			a, b = a - 1, b + 1
+		self.plot.plot(model, a, b, color='red')
+		self.ax.plot(x_sample, y_sample, '.', markersize=2, alpha=0.5)
+		self.canvas.draw()
+
+	def make_output(self, parent):
+		labels = [('coefficients', 'Коэффициенты (c0, c1, ...)'),
+		          ('rows', 'Строк'), ('rmse', 'СКО'), ('r2', 'R²'),
+		          ('fit_time', 'Время')]
+		for row, (key, text) in enumerate(labels):
+			Label(parent, text=text).grid(row=row, column=0, padx=5,
+			                              pady=5, sticky=W)
+			Entry(parent, textvariable=self.results[key],
+			      state='readonly').grid(row=row, column=1, padx=5,
+			                             pady=5, sticky=EW)
+
+class RegressionFrame(Frame):
+	def __init__(self, main_frame, main_app):
+		load_heavy_modules()
+		Frame.__init__(self, main_frame)
 		self.main_app = main_app
+		# Накопленная регрессия и файл со столбцами, по которым она посчитана
+		self.regression = None
+		self.fitted_input = None
+		self.make_widgets()
+
 	def make_widgets(self):
-		self.test_text = Label(self, text="Here'll be some approximation "
-		                                  "stuff")
-		self.test_text.pack(expand=True, fill=BOTH)
+		self.input_num_frame = Frame(self)
+		self.output_num_frame = Frame(self)
+		self.input_num_frame.pack(side=TOP, fill=X)
+		self.output_num_frame.pack(side=TOP, expand=True, fill=BOTH)
+
+		labels = ['Файл (.csv, .npy)', 'Столбцы x', 'Столбец y']
+		for row, text in enumerate(labels):
+			Label(self.input_num_frame, text=text).grid(
+				row=row, column=0, padx=5, pady=5
+			)
+
+		self.path = StringVar()
+		self.x_columns = StringVar(value='0')
+		self.y_column = StringVar(value='1')
+
+		Entry(self.input_num_frame, textvariable=self.path).grid(
+			row=0, column=1, padx=5, pady=5
+		)
+		Button(self.input_num_frame, text='Обзор...',
+		       command=self.browse).grid(row=0, column=2, padx=5, pady=5)
+		Entry(self.input_num_frame, textvariable=self.x_columns).grid(
+			row=1, column=1, padx=5, pady=5
+		)
+		Entry(self.input_num_frame, textvariable=self.y_column).grid(
+			row=2, column=1, padx=5, pady=5
+		)
+		Button(self.input_num_frame, text='Рассчитать',
+		       command=self.printer).grid(row=3, column=0, padx=5, pady=5)
+		Button(self.input_num_frame, text='Добавить новые строки',
+		       command=self.append_rows).grid(row=3, column=1, padx=5, pady=5)
+
+		self.progress_panel = ProgressPanel(self.input_num_frame)
+		self.progress_panel.grid(row=4, column=0, columnspan=3, sticky=EW)
+
+		self.results = {}
+		labels = [('rows', 'Строк'), ('rmse', 'СКО'), ('r2', 'R²'),
+		          ('adjusted_r2', 'R² скорректированный'),
+		          ('fit_time', 'Время')]
+		for row, (key, text) in enumerate(labels):
+			self.results[key] = StringVar()
+			Label(self.output_num_frame, text=text).grid(
+				row=row, column=0, padx=5, pady=5, sticky=W
+			)
+			Entry(self.output_num_frame, textvariable=self.results[key],
+			      state='readonly').grid(row=row, column=1, padx=5,
+			                             pady=5, sticky=EW)
+
+		Label(self.output_num_frame, text='Коэффициенты ± ст. ошибка').grid(
+			row=len(labels), column=0, padx=5, pady=5, sticky=NW
+		)
+		self.coefficients_list = Listbox(self.output_num_frame, width=40)
+		self.coefficients_list.grid(row=len(labels), column=1, padx=5,
+		                            pady=5, sticky=NSEW)
+
+	def browse(self):
+		from tkinter import filedialog
+		path = filedialog.askopenfilename(
+			filetypes=[('Данные', '*.csv *.npy'), ('Все файлы', '*')]
+		)
+		if path:
+			self.path.set(path)
+
+	def printer(self):
+		self.run_fit(incremental=False)
+
+	def append_rows(self):
+		self.run_fit(incremental=True)
+
+	def run_fit(self, incremental):
+		path = self.path.get()
+		if path == '':
+			show_error(EmptyInput("You didn't choose data file"))
+			return
+		try:
+			x_columns = regression.parse_columns(self.x_columns.get())
+			y_column = regression.parse_columns(self.y_column.get())[0]
+		except Exception as e:
+			show_error(e)
+			return
+
+		# Дочитываем только строки, дописанные в файл после прошлого
+		# расчета, если файл и столбцы те же
+		previous = None
+		if incremental and self.fitted_input == (path, x_columns, y_column):
+			previous = self.regression
+
+		def job(progress):
+			return regression.fit_file(
+				path, x_columns, y_column, previous,
+				progress=lambda rows: progress('МКР', rows)
+			)
+
+		def done(outcome):
+			result, self.regression = outcome
+			self.fitted_input = (path, x_columns, y_column)
+			self.show_results(result, x_columns)
+
+		self.progress_panel.run(job, done, 'Чтение данных...')
+
+	def show_results(self, result, x_columns):
+		self.results['rows'].set(result.rows)
+		self.results['rmse'].set(f'{result.rmse:.6g}')
+		self.results['r2'].set(f'{result.r2:.6f}')
+		self.results['adjusted_r2'].set(f'{result.adjusted_r2:.6f}')
+		self.results['fit_time'].set(f'{result.fit_time:.3f} с')
+		self.coefficients_list.delete(0, END)
+		names = ['b0'] + [f'x{column}' for column in x_columns]
+		for name, value, error in zip(names, result.coefficients,
+		                              result.standard_errors):
+			self.coefficients_list.insert(END, f'{name}: {value:.8g} ± '
+			                                   f'{error:.3g}')
 
 class InterpolationFrame(Frame):
+	# Разбиение для интеграла от интерполянта по Симпсону
+	INTEGRAL_N = 1000
+
 	def __init__(self, main_frame, main_app):
+		load_heavy_modules()
 		Frame.__init__(self, main_frame)
-		self.make_widgets()
 		self.main_app = main_app
+		self.make_widgets()
+
 	def make_widgets(self):
-		self.test_text = Label(self, text="Here'll be some Interpolation "
-		                                  "stuff")
-		self.test_text.pack(expand=True, fill=BOTH)
+		self.input_area_frame = Frame(self)
+		self.graph_area_frame = Frame(self)
+		self.pick_method_frame = Frame(self.input_area_frame)
+		self.input_num_frame = Frame(self.input_area_frame)
+		self.output_num_frame = Frame(self.input_area_frame)
+		self.input_area_frame.pack(side=LEFT, expand=True, fill=BOTH)
+		self.graph_area_frame.pack(side=RIGHT, expand=True, fill=BOTH)
+		self.pick_method_frame.pack(side=TOP, fill=X)
+		self.input_num_frame.pack(side=TOP, fill=X)
+		self.output_num_frame.pack(side=TOP, expand=True, fill=BOTH)
+
+		self.method = StringVar(value='natural')
+		methods = [('Естественный сплайн', 'natural'),
+		           ('Сплайн с заданными f\'', 'clamped'),
+		           ('Лагранж', 'lagrange'),
+		           ('Ньютон', 'newton')]
+		for row, (text, value) in enumerate(methods):
+			Radiobutton(self.pick_method_frame, text=text,
+			            variable=self.method, value=value).grid(
+				row=row, column=0, padx=5, pady=2, sticky=W
+			)
+
+		labels = ['x узлов', 'y узлов', "f'(x0), f'(xn)", 'x*']
+		for row, text in enumerate(labels):
+			Label(self.input_num_frame, text=text).grid(
+				row=row, column=0, padx=5, pady=5
+			)
+
+		self.x_values = StringVar()
+		self.y_values = StringVar()
+		self.slopes = StringVar(value='0, 0')
+		self.point = StringVar()
+
+		Entry(self.input_num_frame, textvariable=self.x_values).grid(row=0, column=1, padx=5, pady=5)
+		Entry(self.input_num_frame, textvariable=self.y_values).grid(row=1, column=1, padx=5, pady=5)
+		Entry(self.input_num_frame, textvariable=self.slopes).grid(row=2, column=1, padx=5, pady=5)
+		Entry(self.input_num_frame, textvariable=self.point).grid(row=3, column=1, padx=5, pady=5)
+
+		Button(self.input_num_frame, text='Построить',
+		       command=self.printer).grid(row=4, column=0, padx=5, pady=5)
+
+		self.results = {}
+		self.results['value'] = StringVar()
+		self.results['integral'] = StringVar()
+		Label(self.output_num_frame, text='P(x*)').grid(
+			row=0, column=0, padx=5, pady=5
+		)
+		Label(self.output_num_frame, text='Интеграл (Симпсон)').grid(
+			row=1, column=0, padx=5, pady=5
+		)
+		Entry(self.output_num_frame, textvariable=self.results['value'],
+		      state='readonly').grid(row=0, column=1, padx=5, pady=5)
+		Entry(self.output_num_frame, textvariable=self.results['integral'],
+		      state='readonly').grid(row=1, column=1, padx=5, pady=5)
+
+		self.fig = Figure(figsize=(5, 4), dpi=100)
+		self.ax = self.fig.add_subplot(111)
+		self.ax.set_title("Пустой график")
+
+		self.canvas = FigureCanvasTkAgg(self.fig,
+		                                master=self.graph_area_frame)
+		self.canvas.draw()
+		self.canvas.get_tk_widget().pack(expand=True, fill=BOTH)
+		self.plot = DecimatedPlot(self.ax, self.canvas)
+
+	def printer(self):
+		try:
+			x_arr, y_arr = self.get_input()
+			interpolant = self.build(x_arr, y_arr)
+			self.update_results(interpolant, x_arr)
+			self.update_plot(interpolant, x_arr, y_arr)
+
+		except Exception as e:
+			show_error(e)
+
+	def get_input(self):
+		x_arr = integrals.parse_values(self.x_values.get())
+		y_arr = integrals.parse_values(self.y_values.get())
+		return x_arr, y_arr
+
+	def build(self, x_arr, y_arr):
+		method = self.method.get()
+		if method == 'natural':
+			return interpolation.CubicSpline(x_arr, y_arr)
+		elif method == 'clamped':
+			slopes = integrals.parse_values(self.slopes.get())
+			if len(slopes) != 2:
+				raise InterpolationError('Enter two slopes: at x0 and xn')
+			return interpolation.CubicSpline(x_arr, y_arr, 'clamped', slopes)
+		elif method == 'lagrange':
+			return interpolation.LagrangePolynomial(x_arr, y_arr)
+		else:
+			return interpolation.NewtonPolynomial(x_arr, y_arr)
+
+	def update_results(self, interpolant, x_arr):
+		a, b = min(x_arr), max(x_arr)
+		if self.point.get().strip() == '':
+			self.results['value'].set('')
+		else:
+			x = integrals.parse_values(self.point.get())[0]
+			self.results['value'].set(f'{float(interpolant(x)):.10g}')
+		if a < b:
+			self.results['integral'].set(
+				integrals.simpson_rule(interpolant, a, b, self.INTEGRAL_N)
+			)
+
+	def update_plot(self, interpolant, x_arr, y_arr):
+		a, b = min(x_arr), max(x_arr)
+		if a == b:
+			a, b = a - 1, b + 1
+		self.plot.plot(interpolant, a, b)
+		self.ax.plot(x_arr, y_arr, 'o', color='red', markersize=4)
+		self.canvas.draw()
 
 class DifferentialEquationFrame(Frame):
+	# Сколько траекторий ансамбля рисуется на графике
+	PLOT_TRAJECTORIES = 50
+
 	def __init__(self, main_frame, main_app):
+		load_heavy_modules()
 		Frame.__init__(self, main_frame)
-		self.make_widgets()
 		self.main_app = main_app
+		self.make_widgets()
+
 	def make_widgets(self):
-		self.test_text = Label(self, text="Here'll be some "
-		                                  "differential equations stuff")
-		self.test_text.pack(expand=True, fill=BOTH)
+		self.input_area_frame = Frame(self)
+		self.graph_area_frame = Frame(self)
+		self.pick_method_frame = Frame(self.input_area_frame)
+		self.input_num_frame = Frame(self.input_area_frame)
+		self.output_num_frame = Frame(self.input_area_frame)
+		self.input_area_frame.pack(side=LEFT, expand=True, fill=BOTH)
+		self.graph_area_frame.pack(side=RIGHT, expand=True, fill=BOTH)
+		self.pick_method_frame.pack(side=TOP, fill=X)
+		self.input_num_frame.pack(side=TOP, fill=X)
+		self.output_num_frame.pack(side=TOP, expand=True, fill=BOTH)
+
+		self.method = StringVar(value='dormand_prince')
+		methods = [('Эйлер', 'euler'),
+		           ('Рунге–Кутта 4', 'rk4'),
+		           ('Дорманд–Принс (адаптивный)', 'dormand_prince')]
+		for row, (text, value) in enumerate(methods):
+			Radiobutton(self.pick_method_frame, text=text,
+			            variable=self.method, value=value).grid(
+				row=row, column=0, padx=5, pady=2, sticky=W
+			)
+
+		labels = ["y' = f(x, y)", 'x0', 'x1', 'y(x0), через запятую', 'n',
+		          'Точность']
+		for row, text in enumerate(labels):
+			Label(self.input_num_frame, text=text).grid(
+				row=row, column=0, padx=5, pady=5
+			)
+
+		self.expression = StringVar(value='-x * y')
+		self.lower = StringVar(value='0')
+		self.upper = StringVar(value='1')
+		self.initial = StringVar(value='1')
+		self.stride = StringVar(value='100')
+		self.tolerance = StringVar(value='1e-6')
+
+		Entry(self.input_num_frame, textvariable=self.expression).grid(row=0, column=1, padx=5, pady=5)
+		Entry(self.input_num_frame, textvariable=self.lower).grid(row=1, column=1, padx=5, pady=5)
+		Entry(self.input_num_frame, textvariable=self.upper).grid(row=2, column=1, padx=5, pady=5)
+		Entry(self.input_num_frame, textvariable=self.initial).grid(row=3, column=1, padx=5, pady=5)
+		Entry(self.input_num_frame, textvariable=self.stride).grid(row=4, column=1, padx=5, pady=5)
+		Entry(self.input_num_frame, textvariable=self.tolerance).grid(row=5, column=1, padx=5, pady=5)
+
+		Button(self.input_num_frame, text='Решить',
+		       command=self.printer).grid(row=6, column=0, padx=5, pady=5)
+
+		self.progress_panel = ProgressPanel(self.input_num_frame)
+		self.progress_panel.grid(row=7, column=0, columnspan=2, sticky=EW)
+
+		self.results = {}
+		self.results['trajectories'] = StringVar()
+		self.results['evaluations'] = StringVar()
+		self.results['time'] = StringVar()
+		labels = [('trajectories', 'Траекторий'),
+		          ('evaluations', 'Вычислений f'), ('time', 'Время')]
+		for row, (key, text) in enumerate(labels):
+			Label(self.output_num_frame, text=text).grid(
+				row=row, column=0, padx=5, pady=5, sticky=W
+			)
+			Entry(self.output_num_frame, textvariable=self.results[key],
+			      state='readonly').grid(row=row, column=1, padx=5,
+			                             pady=5, sticky=EW)
+
+		Label(self.output_num_frame, text='y(x1)').grid(
+			row=3, column=0, padx=5, pady=5, sticky=NW
+		)
+		scrollbar = Scrollbar(self.output_num_frame)
+		scrollbar.grid(row=3, column=2, sticky=NS)
+		self.final_list = Listbox(self.output_num_frame,
+		                          yscrollcommand=scrollbar.set)
+		self.final_list.grid(row=3, column=1, padx=5, pady=5, sticky=NSEW)
+		scrollbar.config(command=self.final_list.yview)
+
+		self.fig = Figure(figsize=(5, 4), dpi=100)
+		self.ax = self.fig.add_subplot(111)
+		self.ax.set_title("Пустой график")
+
+		self.canvas = FigureCanvasTkAgg(self.fig,
+		                                master=self.graph_area_frame)
+		self.canvas.draw()
+		self.canvas.get_tk_widget().pack(expand=True, fill=BOTH)
+
+	def printer(self):
+		try:
+			params = self.get_input()
+		except Exception as e:
+			show_error(e)
+			return
+		# Переменные tkinter читаем здесь, а не в фоновом потоке
+		method = self.method.get()
+
+		def job(progress):
+			start = time.perf_counter()
+			solution = self.solve(method, *params,
+			                      progress=lambda steps: progress('ОДУ', steps))
+			return solution, time.perf_counter() - start
+
+		self.progress_panel.run(job, self.show_results, 'Решение...')
+
+	def show_results(self, outcome):
+		solution, elapsed = outcome
+		try:
+			self.update_results(solution, elapsed)
+			self.update_plot(solution)
+		except Exception as e:
+			show_error(e)
+
+	def get_input(self):
+		kernel = expressions.compile_expression(self.expression.get(),
+		                                        ('x', 'y'))
+		# Ансамбль: одна траектория на каждое начальное значение
+		y0 = integrals.parse_values(self.initial.get()).reshape(-1, 1)
+		return (kernel, self.lower.get(), self.upper.get(), y0,
+		        self.stride.get(), self.tolerance.get())
+
+	def solve(self, method, func, a, b, y0, n, tolerance, progress=None):
+		if method == 'dormand_prince':
+			return ode.dormand_prince(func, a, b, y0, n, tolerance,
+			                          progress=progress)
+		return ode.METHODS[method](func, a, b, y0, n, progress=progress)
+
+	def update_results(self, solution, elapsed):
+		final = solution.y[-1, :, 0]
+		self.results['trajectories'].set(len(final))
+		self.results['evaluations'].set(solution.evaluations)
+		self.results['time'].set(f'{elapsed:.3f} с')
+		self.final_list.delete(0, END)
+		for y in final[:1000]:
+			self.final_list.insert(END, f'{y:.10g}')
+		if len(final) > 1000:
+			self.final_list.insert(END, f'... еще {len(final) - 1000}')
+
+	def update_plot(self, solution):
+		trajectories = solution.y[:, :, 0]
+		step = max(trajectories.shape[1] // self.PLOT_TRAJECTORIES, 1)
+		self.ax.clear()
+		self.ax.plot(solution.t, trajectories[:, ::step], linewidth=1)
+		self.ax.set_xlabel('x')
+		self.ax.set_ylabel('y')
+		self.canvas.draw()
 
 if __name__ == "__main__":
-    app = MainApp()
+    profile = None
+    if '--startup-profile' in sys.argv:
+        profile = StartupProfile()
+    app = MainApp(profile)
     app.run()
\ No newline at end of file
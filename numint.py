@@ -0,0 +1,182 @@
+"""
+Headless command-line front end for integrals.py.
+
+Reads jobs from a CSV or JSONL file and writes one JSON line per job, in
+input order, as soon as the job is done. Never imports tkinter or
+matplotlib, so it runs on servers without a display.
+
+Job fields:
+    function   function_1, function_2 or a formula of x (see expressions.py)
+    a, b, n    bounds and number of subintervals
+    method     left_rectangle, right_rectangle, trapezoidal, simpson_rule,
+               romberg, gauss_legendre, all (the four basic rules and Romberg
+               from one sampling),
+               common_step (find_common_step) or adaptive_gauss_kronrod
+    tolerance  optional; if given, the method is refined by the Runge rule
+               (required by adaptive_gauss_kronrod)
+
+Usage:
+    python -m numint jobs.csv -o results.jsonl --workers 8
+    python -m numint jobs.csv --summation fsum --no-round
+    python -m integrals jobs.jsonl
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import integrals
+import expressions
+
+FUNCTIONS = {
+	'function_1': integrals.function_1,
+	'function_2': integrals.function_2,
+}
+
+METHODS = {
+	'left_rectangle': integrals.left_rectangle,
+	'right_rectangle': integrals.right_rectangle,
+	'trapezoidal': integrals.trapezoidal,
+	'simpson_rule': integrals.simpson_rule,
+	'romberg': integrals.romberg,
+	'gauss_legendre': integrals.gauss_legendre,
+}
+
+def read_jobs(path, file_format=None):
+	"""Yields jobs as dicts from a CSV or JSONL file ('-' for stdin)."""
+	if file_format is None:
+		file_format = 'csv' if path.endswith('.csv') else 'jsonl'
+	stream = sys.stdin if path == '-' else open(path, newline='',
+	                                           encoding='utf-8')
+	with stream:
+		if file_format == 'csv':
+			yield from csv.DictReader(stream)
+		else:
+			for line in stream:
+				if line.strip():
+					yield json.loads(line)
+
+def to_json(value):
+	"""Converts numpy scalars in results to plain Python numbers."""
+	if isinstance(value, dict):
+		return {key: to_json(item) for key, item in value.items()}
+	if isinstance(value, np.generic):
+		return value.item()
+	return value
+
+def run_job(job):
+	"""Computes one job. Errors are returned, not raised, so one bad line
+	doesn't stop the whole file."""
+	try:
+		name = job.get('function', 'function_1')
+		func = FUNCTIONS.get(name) or expressions.compile_expression(name)
+		a, b, n = job.get('a', ''), job.get('b', ''), job.get('n', '')
+		method = job.get('method', 'all')
+		tolerance = job.get('tolerance')
+		if method not in METHODS and method not in ('all', 'common_step',
+		                                            'adaptive_gauss_kronrod'):
+			return {'result': None, 'error': f'Unknown method: {method}'}
+
+		if method == 'common_step':
+			result = integrals.find_common_step(func, a, b, n)
+		elif method == 'adaptive_gauss_kronrod':
+			result = integrals.adaptive_gauss_kronrod(func, a, b, tolerance, n)
+		elif tolerance in (None, ''):
+			if method == 'all':
+				result = integrals.integrate_all(func, a, b, n)
+			else:
+				result = METHODS[method](func, a, b, n)
+		elif method == 'all':
+			result = integrals.runge_rule_all(func, a, b, n, tolerance)
+		else:
+			result = integrals.runge_rule(METHODS[method], func, a, b, n,
+			                              tolerance, incremental=True)
+		return {'result': to_json(result), 'error': None}
+	except Exception as e:
+		return {'result': None, 'error': f'{type(e).__name__}: {e}'}
+
+def run_jobs(jobs, workers=1):
+	"""
+	    Yields (job, outcome) in input order.
+
+	    With workers > 1 jobs run in a process pool; at most 4 * workers
+	    jobs are in flight, so the input file is never read whole. If the
+	    generator is closed early, queued jobs are cancelled and only the
+	    running ones are waited for.
+	"""
+	if workers <= 1:
+		for job in jobs:
+			yield job, run_job(job)
+		return
+
+	# Настройки точности передаем процессам явно, при spawn они не наследуются
+	with ProcessPoolExecutor(max_workers=workers,
+	                         initializer=integrals.set_precision,
+	                         initargs=(integrals.SUMMATION,
+	                                   integrals.ROUND_DIGITS)) as executor:
+		pending = deque()
+		try:
+			for job in jobs:
+				pending.append((job, executor.submit(run_job, job)))
+				if len(pending) >= 4 * workers:
+					job, future = pending.popleft()
+					yield job, future.result()
+			while pending:
+				job, future = pending.popleft()
+				yield job, future.result()
+		finally:
+			executor.shutdown(wait=False, cancel_futures=True)
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(
+		prog='numint',
+		description='Batch numerical integration without GUI.'
+	)
+	parser.add_argument('jobs', help="CSV or JSONL file with jobs, '-' for stdin")
+	parser.add_argument('-o', '--output', default='-',
+	                    help="JSONL file for results, '-' for stdout")
+	parser.add_argument('-f', '--format', choices=['csv', 'jsonl'],
+	                    help='input format, guessed from extension by default')
+	parser.add_argument('-w', '--workers', type=int, default=1,
+	                    help='number of worker processes')
+	parser.add_argument('--summation', choices=integrals.SUMMATIONS,
+	                    default='pairwise',
+	                    help='how sums over grid blocks are accumulated')
+	parser.add_argument('--no-round', action='store_true',
+	                    help='keep results unrounded instead of 5 digits')
+	args = parser.parse_args(argv)
+	integrals.set_precision(args.summation,
+	                        None if args.no_round else 5)
+
+	# sys.stdout не закрываем, им может пользоваться вызывающий код
+	if args.output == '-':
+		output = contextlib.nullcontext(sys.stdout)
+	else:
+		output = open(args.output, 'w', encoding='utf-8')
+	with output as stream:
+		jobs = read_jobs(args.jobs, args.format)
+		outcomes = run_jobs(jobs, args.workers)
+		try:
+			for line, (job, outcome) in enumerate(outcomes, 1):
+				record = {'line': line, **job, **outcome}
+				stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+				stream.flush()
+		except BrokenPipeError:
+			# Читатель закрыл канал (| head): останавливаем пул и выходим
+			# молча; stdout перенаправляем в /dev/null, иначе Python
+			# напишет ошибку при сбросе буфера на выходе
+			outcomes.close()
+			if stream is sys.stdout:
+				devnull = os.open(os.devnull, os.O_WRONLY)
+				os.dup2(devnull, sys.stdout.fileno())
+			return 1
+	return 0
+
+if __name__ == '__main__':
+	sys.exit(main())
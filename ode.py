@@ -0,0 +1,309 @@
+"""
+Ordinary differential equations y' = f(t, y) for ensembles of
+trajectories.
+
+All trajectories of an ensemble (different initial conditions or
+parameters) are integrated together: the state is one (m, d) array and
+every stage of a step is a single call of f on it. Results are written
+into output arrays allocated once before the integration.
+
+The right-hand side is called as f(t, y, *args), where y has shape
+(m, d) and t is a number or an (m, 1) column (adaptive steps differ per
+trajectory), so formulas written with broadcasting work in both cases.
+Every element of args is an array with m rows, e.g. parameters of the
+trajectories; the solver passes only the rows of the trajectories it is
+stepping.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from integrals import validate_input, validate_tolerance
+
+
+OdeSolution = namedtuple('OdeSolution', ['t', 'y', 'evaluations'])
+
+# Через сколько шагов вызывается progress; чаще — GUI захлебнется
+# сообщениями на мелких ансамблях
+PROGRESS_STEPS = 100
+
+def validate_state(y0):
+	"""Returns y0 as an (m, d) float array and whether it was 1-D (one
+	trajectory)."""
+	y0 = np.array(y0, dtype='float64')
+	if y0.ndim == 0:
+		return y0.reshape(1, 1), True
+	if y0.ndim == 1:
+		return y0.reshape(1, -1), True
+	return y0, False
+
+def fixed_step(stepper, f, t0, t1, y0, n, args=(), save_every=1,
+               progress=None):
+	"""
+	    Integrates with n equal steps of `stepper`, saving every
+	    save_every-th state (and the last one) into a preallocated array.
+	    progress is called as in `euler`.
+
+	    Returns:
+	        OdeSolution: t of shape (k,), y of shape (k, m, d) or (k, d)
+	        for a 1-D y0, number of f calls per trajectory.
+	"""
+	t0, t1, n = validate_input(t0, t1, n)
+	y, single = validate_state(y0)
+	h = (t1 - t0) / n
+
+	saved = list(range(0, n + 1, save_every))
+	if saved[-1] != n:
+		saved.append(n)
+	t_out = t0 + h * np.array(saved, dtype='float64')
+	t_out[-1] = t1
+	y_out = np.empty((len(saved),) + y.shape)
+	y_out[0] = y
+
+	evaluations = 0
+	out = 1
+	for i in range(1, n + 1):
+		y, calls = stepper(f, t0 + (i - 1) * h, y, h, args)
+		evaluations += calls
+		if progress is not None and i % PROGRESS_STEPS == 0:
+			progress(i)
+		if out < len(saved) and saved[out] == i:
+			y_out[out] = y
+			out += 1
+	if single:
+		y_out = y_out[:, 0]
+	return OdeSolution(t_out, y_out, evaluations)
+
+def euler_step(f, t, y, h, args):
+	return y + h * f(t, y, *args), 1
+
+def rk4_step(f, t, y, h, args):
+	k1 = f(t, y, *args)
+	k2 = f(t + h / 2, y + h / 2 * k1, *args)
+	k3 = f(t + h / 2, y + h / 2 * k2, *args)
+	k4 = f(t + h, y + h * k3, *args)
+	return y + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4), 4
+
+def euler(f, t0, t1, y0, n, args=(), save_every=1, progress=None):
+	"""
+	    Explicit Euler method, first order.
+
+	    Args:
+	        f (callable): Right-hand side f(t, y, *args).
+	        t0 (float): Initial time.
+	        t1 (float): Final time.
+	        y0 (array-like): Initial states, (m, d) for an ensemble.
+	        n (int): Number of steps.
+	        args (tuple): Arrays with m rows passed to f.
+	        save_every (int): Save every k-th state to limit memory.
+	        progress (callable): Called as progress(steps) every
+	            PROGRESS_STEPS steps, may raise CalculationCancelled.
+
+	    Returns:
+	        OdeSolution: See `fixed_step`.
+	"""
+	return fixed_step(euler_step, f, t0, t1, y0, n, args, save_every,
+	                  progress)
+
+def rk4(f, t0, t1, y0, n, args=(), save_every=1, progress=None):
+	"""
+	    Classic fourth order Runge–Kutta method, arguments as in `euler`.
+	"""
+	return fixed_step(rk4_step, f, t0, t1, y0, n, args, save_every,
+	                  progress)
+
+# Таблица Бутчера метода Дормана–Принса 5(4)
+DP_C = np.array([0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1, 1])
+DP_A = [
+	[],
+	[1 / 5],
+	[3 / 40, 9 / 40],
+	[44 / 45, -56 / 15, 32 / 9],
+	[19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+	[9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+	[35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84],
+]
+# Разность весов решений 5-го и 4-го порядка — оценка ошибки шага
+DP_E = np.array([35 / 384 - 5179 / 57600, 0, 500 / 1113 - 7571 / 16695,
+                 125 / 192 - 393 / 640, -2187 / 6784 + 92097 / 339200,
+                 11 / 84 - 187 / 2100, -1 / 40])
+
+# Непрерывное продолжение 4-го порядка (Hairer, Nørsett, Wanner):
+# y(t + theta h) = y + h * sum_j b_j(theta) k_j, b_j — многочлены по
+# theta, строка j — коэффициенты при theta, theta^2, theta^3, theta^4
+DP_P = np.array([
+	[1, -8048581381 / 2820520608, 8663915743 / 2820520608,
+	 -12715105075 / 11282082432],
+	[0, 0, 0, 0],
+	[0, 131558114200 / 32700410799, -68118460800 / 10900136933,
+	 87487479700 / 32700410799],
+	[0, -1754552775 / 470086768, 14199869525 / 1410260304,
+	 -10690763975 / 1880347072],
+	[0, 127303824393 / 49829197408, -318862633887 / 49829197408,
+	 701980252875 / 199316789632],
+	[0, -282668133 / 205662961, 2019193451 / 616988883,
+	 -1453857185 / 822651844],
+	[0, 40617522 / 29380423, -110615467 / 29380423,
+	 69997945 / 29380423],
+])
+
+def dense_output(y0, k, h, theta):
+	"""
+	    Dormand–Prince continuous extension inside accepted steps.
+
+	    Args:
+	        y0 (np.ndarray): (r, d) states at the start of the steps.
+	        k (list): 7 arrays (r, d) of stage derivatives of the steps.
+	        h (np.ndarray): (r, 1) signed step sizes.
+	        theta (np.ndarray): (r, 1) positions inside the steps, in [0, 1].
+
+	    Returns:
+	        np.ndarray: (r, d) states, 4th order accurate.
+	"""
+	powers = theta ** np.arange(1, 5)
+	weights = powers @ DP_P.T
+	return y0 + h * sum(weights[:, j, None] * k[j] for j in range(7)
+	                    if DP_P[j].any())
+
+def dormand_prince(f, t0, t1, y0, n, tolerance=1e-6, args=(),
+                   max_steps=10 ** 5, progress=None):
+	"""
+	    Adaptive Dormand–Prince 5(4) method (RK45) with a separate step
+	    size for every trajectory.
+
+	    Notes:
+	        - Only trajectories not yet at t1 are stepped; a trajectory
+	          whose step is rejected retries with a smaller one while the
+	          others go on.
+	        - The solution is written at n+1 equal times into a
+	          preallocated array by the 4th order continuous extension of
+	          the method, built from the stages already computed, so
+	          outputs don't limit the step size.
+	        - The error of a step is measured relative to |y| with
+	          rtol = tolerance and atol = tolerance / 1000.
+	        - t1 < t0 integrates backward; for t1 == t0 y0 is returned.
+
+	    Args:
+	        f (callable): Right-hand side f(t, y, *args).
+	        t0 (float): Initial time.
+	        t1 (float): Final time.
+	        y0 (array-like): Initial states, (m, d) for an ensemble.
+	        n (int): Number of output intervals.
+	        tolerance (float): Relative error tolerance of a step.
+	        args (tuple): Arrays with m rows passed to f.
+	        max_steps (int): Limit of steps, accepted or not.
+	        progress (callable): Called as progress(steps) every
+	            PROGRESS_STEPS steps, may raise CalculationCancelled.
+
+	    Raises:
+	        RuntimeError: If some trajectory needs more than max_steps.
+
+	    Returns:
+	        OdeSolution: t of shape (n+1,), y of shape (n+1, m, d) or
+	        (n+1, d) for a 1-D y0, number of f calls per trajectory
+	        (the maximum over the ensemble).
+	"""
+	t0, t1, n = validate_input(t0, t1, n)
+	rtol = validate_tolerance(tolerance)
+	atol = rtol / 1000
+	y, single = validate_state(y0)
+	m = len(y)
+	args = tuple(np.asarray(arg) for arg in args)
+
+	t_out = np.linspace(t0, t1, n + 1)
+	# NaN вместо np.empty: незаписанная строка не вернет мусор из памяти
+	y_out = np.full((n + 1,) + y.shape, np.nan)
+	y_out[0] = y
+	if t1 == t0:
+		y_out[:] = y
+		return OdeSolution(t_out, y_out[:, 0] if single else y_out, 0)
+	# Все сравнения времен ведем вдоль направления интегрирования
+	direction = np.sign(t1 - t0)
+	next_out = np.ones(m, dtype='int64')
+
+	t = np.full((m, 1), t0)
+	k_first = f(t, y, *args)
+	evaluations = np.ones(m, dtype='int64')
+	# Начальный шаг по оценке |y| / |y'|, как в большинстве реализаций
+	scale = atol + rtol * np.abs(y)
+	d0 = np.sqrt(np.mean((y / scale) ** 2, axis=1, keepdims=True))
+	d1 = np.sqrt(np.mean((k_first / scale) ** 2, axis=1, keepdims=True))
+	with np.errstate(divide='ignore', invalid='ignore'):
+		h = np.where((d0 < 1e-5) | (d1 < 1e-5), 1e-6, 0.01 * d0 / d1)
+	h = np.minimum(h, abs(t1 - t0))
+
+	active = np.arange(m)
+	steps = 0
+	while len(active) > 0:
+		steps += 1
+		if steps > max_steps:
+			raise RuntimeError('ODE solver did not converge.')
+		if progress is not None and steps % PROGRESS_STEPS == 0:
+			progress(steps)
+		t_a, y_a = t[active], y[active]
+		h_a = direction * h[active]
+		rows_args = tuple(arg[active] for arg in args)
+
+		k = [k_first[active]]
+		for stage in range(1, 7):
+			y_stage = y_a + h_a * sum(coef * k[j] for j, coef in
+			                          enumerate(DP_A[stage]) if coef)
+			k.append(f(t_a + DP_C[stage] * h_a, y_stage, *rows_args))
+		evaluations[active] += 6
+		# Седьмая стадия считается в новой точке и переходит в следующий
+		# шаг первой (FSAL)
+		y_new = y_stage
+
+		error = h_a * sum(coef * k[j] for j, coef in enumerate(DP_E) if coef)
+		scale = atol + rtol * np.maximum(np.abs(y_a), np.abs(y_new))
+		error_norm = np.sqrt(np.mean((error / scale) ** 2, axis=1))
+		accept = error_norm <= 1
+
+		with np.errstate(divide='ignore'):
+			factor = np.clip(0.9 * error_norm ** -0.2, 0.2, 5.0)
+		h_next = h[active, 0] * np.where(accept, factor, np.minimum(factor, 1))
+
+		rows = active[accept]
+		if len(rows):
+			t_old = t_a[accept, 0]
+			step = h_a[accept, 0]
+			last = np.abs(step) >= direction * (t1 - t_old)
+			t_new = np.where(last, t1, t_old + step)
+			accepted = np.flatnonzero(accept)
+			# Записываем все выходные моменты, попавшие внутрь шага
+			while True:
+				pending = (next_out[rows] <= n) & (direction * (
+					t_out[np.minimum(next_out[rows], n)] - t_new) <= 0)
+				if not np.any(pending):
+					break
+				r = rows[pending]
+				local = accepted[pending]
+				out = next_out[r]
+				theta = ((t_out[out] - t_old[pending]) /
+				         step[pending])[:, None]
+				y_out[out, r] = dense_output(
+					y_a[local], [k_j[local] for k_j in k], h_a[local],
+					theta
+				)
+				next_out[r] += 1
+
+			t[rows, 0] = t_new
+			y[rows] = y_new[accept]
+			k_first[rows] = k[6][accept]
+
+		h[active, 0] = np.minimum(h_next, direction * (t1 - t[active, 0]))
+		active = active[direction * (t1 - t[active, 0]) > 0]
+		if np.any(h[active, 0] <= 1e-14 * np.abs(t[active, 0]) + 1e-300):
+			raise RuntimeError('ODE solver step size underflow.')
+
+	# Финальная точка — точное значение последнего шага
+	y_out[-1] = y
+	if single:
+		y_out = y_out[:, 0]
+	return OdeSolution(t_out, y_out, int(np.max(evaluations)))
+
+METHODS = {
+	'euler': euler,
+	'rk4': rk4,
+	'dormand_prince': dormand_prince,
+}
@@ -0,0 +1,227 @@
+"""
+Multiple linear regression y = b_0 + b_1 x_1 + ... + b_k x_k by least
+squares (the MCM of the About screen).
+
+The fit is kept as a running QR decomposition: only the triangular
+factor R of the augmented matrix [1, X, y] is stored, and each chunk of
+rows is folded into it by one small QR of R stacked on the chunk. So a
+file is fitted in one pass with memory independent of its length, and
+rows appended later are added to a saved fit without reading the old
+ones again. Unlike accumulating XᵀX (see least_squares.NormalEquations)
+this doesn't square the condition number, which matters for raw,
+unscaled columns.
+"""
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from integrals import EmptyInput, NonNumInput
+from least_squares import CHUNK_ROWS, FitError, read_chunks
+
+
+RegressionResult = namedtuple('RegressionResult', [
+	'coefficients', 'standard_errors', 'rows', 'rmse', 'r2',
+	'adjusted_r2', 'fit_time'
+])
+
+def parse_columns(text):
+	"""Parses column numbers separated by commas or spaces."""
+	parts = text.replace(',', ' ').split()
+	if not parts:
+		raise EmptyInput("You didn't enter columns")
+	try:
+		columns = [int(part) for part in parts]
+	except ValueError:
+		raise NonNumInput('Columns must be integers')
+	if min(columns) < 0:
+		raise FitError('Columns are numbered from 0')
+	return columns
+
+
+class LinearRegression:
+	"""
+	    Incremental least squares fit of y on k variables with intercept.
+
+	    Rows are added with `add` at any moment, before or after `solve`;
+	    the state is (k+2)^2 numbers and can be saved to a file with `save`
+	    and restored with `load` to continue a fit later.
+
+	    Notes:
+	        - After all rows, R[-1, -1]^2 is the residual sum of squares,
+	          so residual statistics need no second pass over the data.
+	        - The mean and spread of y are merged chunk by chunk
+	          (Chan et al.), the total sum of squares doesn't suffer
+	          from cancellation like yᵀy - n * mean^2.
+
+	    Args:
+	        variables (int): Number of explanatory variables k.
+	"""
+
+	def __init__(self, variables):
+		self.variables = variables
+		self.r = np.zeros((0, variables + 2))
+		self.rows = 0
+		self.y_mean = 0.0
+		self.y_m2 = 0.0
+
+	def __repr__(self):
+		return (f'LinearRegression(variables={self.variables}, '
+		        f'rows={self.rows})')
+
+	def add(self, x_arr, y_arr):
+		"""
+		    Adds observations.
+
+		    Args:
+		        x_arr (array-like): (rows, k) values of the variables, or
+		            (rows,) for k = 1.
+		        y_arr (array-like): (rows,) values of y.
+		"""
+		y_arr = np.asarray(y_arr, dtype='float64').ravel()
+		if len(y_arr) == 0:
+			return
+		x_arr = np.asarray(x_arr, dtype='float64').reshape(len(y_arr), -1)
+		if x_arr.shape[1] != self.variables:
+			raise FitError(f'Expected {self.variables} variables, '
+			               f'got {x_arr.shape[1]}')
+
+		augmented = np.empty((len(y_arr), self.variables + 2))
+		augmented[:, 0] = 1.0
+		augmented[:, 1:-1] = x_arr
+		augmented[:, -1] = y_arr
+		self.r = np.linalg.qr(np.vstack((self.r, augmented)), mode='r')
+
+		# Объединение среднего и суммы квадратов отклонений двух частей
+		count = len(y_arr)
+		mean = np.mean(y_arr)
+		total = self.rows + count
+		delta = mean - self.y_mean
+		self.y_m2 += np.sum((y_arr - mean) ** 2) + \
+			delta * delta * self.rows * count / total
+		self.y_mean += delta * count / total
+		self.rows = total
+
+	def factor(self):
+		"""Returns R of [1, X] and Qᵀy, zero-padded while rows are few."""
+		size = self.variables + 2
+		r = np.zeros((size, size))
+		r[:len(self.r)] = self.r
+		return r[:-1, :-1], r[:-1, -1], r[-1, -1]
+
+	def solve(self):
+		"""
+		    Returns coefficients and statistics of the rows added so far.
+
+		    Raises:
+		        FitError: If there are too few rows or the variables are
+		            linearly dependent.
+
+		    Returns:
+		        RegressionResult: fit_time is 0, callers measure it.
+		"""
+		size = self.variables + 1
+		if self.rows <= size:
+			raise FitError('Need more rows than coefficients')
+		r, qty, residual = self.factor()
+		diagonal = np.abs(np.diag(r))
+		if np.min(diagonal) <= 1e-12 * np.max(diagonal):
+			raise FitError('Variables are linearly dependent')
+
+		coefficients = np.linalg.solve(r, qty)
+		rss = residual * residual
+		dof = self.rows - size
+		# Ковариация коэффициентов sigma^2 (RᵀR)^-1, строки R^-1 по норме
+		r_inv = np.linalg.solve(r, np.eye(size))
+		standard_errors = np.sqrt(rss / dof) * np.linalg.norm(r_inv, axis=1)
+		if self.y_m2 > 0:
+			r2 = 1 - rss / self.y_m2
+			adjusted_r2 = 1 - (1 - r2) * (self.rows - 1) / dof
+		else:
+			r2 = adjusted_r2 = 1.0
+		return RegressionResult(coefficients, standard_errors, self.rows,
+		                        np.sqrt(rss / self.rows), r2, adjusted_r2, 0.0)
+
+	def predict(self, x_arr):
+		"""Returns b_0 + X b for the current coefficients."""
+		coefficients = self.solve().coefficients
+		x_arr = np.asarray(x_arr, dtype='float64')
+		return (x_arr.reshape(-1, self.variables) @ coefficients[1:] +
+		        coefficients[0])
+
+	def save(self, path):
+		"""Saves the state into an .npz file."""
+		np.savez(path, r=self.r, rows=self.rows, y_mean=self.y_mean,
+		         y_m2=self.y_m2)
+
+	@classmethod
+	def load(cls, path):
+		"""Restores a regression saved by `save`."""
+		with np.load(path) as state:
+			regression = cls(state['r'].shape[1] - 2)
+			regression.r = state['r']
+			regression.rows = int(state['rows'])
+			regression.y_mean = float(state['y_mean'])
+			regression.y_m2 = float(state['y_m2'])
+		return regression
+
+def fit(x_arr, y_arr):
+	"""
+	    Fits y on the columns of x_arr with intercept, in memory.
+
+	    Returns:
+	        RegressionResult: Coefficients b_0 .. b_k, their standard
+	        errors, number of rows, RMSE, R^2, adjusted R^2, fit time.
+	"""
+	start = time.perf_counter()
+	x_arr = np.asarray(x_arr, dtype='float64')
+	if x_arr.ndim == 1:
+		x_arr = x_arr.reshape(-1, 1)
+	regression = LinearRegression(x_arr.shape[1])
+	regression.add(x_arr, y_arr)
+	return regression.solve()._replace(fit_time=time.perf_counter() - start)
+
+def fit_file(path, x_columns, y_column, regression=None,
+             chunk_rows=CHUNK_ROWS, progress=None):
+	"""
+	    Fits y on several columns of a .npy or CSV file in one pass.
+
+	    Notes:
+	        - With a regression from an earlier call on the same file,
+	          its first regression.rows rows are skipped and only rows
+	          appended since then are read, so a growing file is never
+	          refitted from scratch.
+
+	    Args:
+	        path (str): .npy or CSV file.
+	        x_columns (list): Columns with the variables.
+	        y_column (int): Column with y.
+	        regression (LinearRegression): Fit to continue, or None.
+	        chunk_rows (int): Rows read at once.
+	        progress (callable): Called as progress(rows) after every
+	            chunk, may raise CalculationCancelled.
+
+	    Raises:
+	        EmptyInput: If the file has no rows.
+
+	    Returns:
+	        tuple: (RegressionResult, LinearRegression); the fit time
+	        covers only the rows read by this call.
+	"""
+	start = time.perf_counter()
+	if regression is None:
+		regression = LinearRegression(len(x_columns))
+	elif regression.variables != len(x_columns):
+		raise FitError(f'Expected {regression.variables} variables, '
+		               f'got {len(x_columns)}')
+	for chunk in read_chunks(path, chunk_rows, skip_rows=regression.rows):
+		if max(max(x_columns), y_column) >= chunk.shape[1]:
+			raise FitError(f'Data file has only {chunk.shape[1]} columns')
+		regression.add(chunk[:, x_columns], chunk[:, y_column])
+		if progress is not None:
+			progress(regression.rows)
+	if regression.rows == 0:
+		raise EmptyInput('Data file is empty')
+
+	result = regression.solve()._replace(fit_time=time.perf_counter() - start)
+	return result, regression
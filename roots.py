@@ -0,0 +1,269 @@
+"""
+Roots of nonlinear equations f(x) = 0 on an interval.
+
+The interval is scanned for sign changes in one vectorized pass over a
+uniform grid, then every bracket is refined at once: the bracket ends
+are NumPy arrays and each iteration calls func a single time for all
+brackets still not converged.
+
+Integrands from integrals.py and formulas from expressions.py can be
+used as is; their DomainError and ZeroDenominatorError propagate.
+"""
+import numpy as np
+
+from integrals import BLOCK_SIZE, eval_blocks, validate_input, \
+	validate_tolerance
+
+
+def scan_brackets(func, a, b, n, block_size=BLOCK_SIZE, workers=1):
+	"""
+	    Finds the subintervals of the grid np.linspace(a, b, n+1) where func
+	    changes sign.
+
+	    Notes:
+	        - Grid points where func is exactly zero are roots already and
+	          are returned separately, not as brackets.
+	        - The grid is evaluated in blocks, memory doesn't depend on n.
+
+	    Args:
+	        func (callable): Vectorized function.
+	        a (float): Left end of the interval.
+	        b (float): Right end of the interval.
+	        n (int): Number of grid subintervals.
+	        block_size (int or None): Points evaluated at once.
+	        workers (int): Threads evaluating blocks in parallel.
+
+	    Returns:
+	        tuple: (lo, hi, f_lo, f_hi, zeros) — arrays of bracket ends,
+	        func values at them and grid points with func == 0.
+	"""
+	step = (b - a) / n
+	idx_parts = []
+	f_lo_parts = []
+	f_hi_parts = []
+	zero_parts = []
+	prev = None
+	for i0, func_arr in eval_blocks(func, a, b, n, 0, n, block_size, workers):
+		zero_parts.append(i0 + np.flatnonzero(func_arr == 0))
+		# Стык с предыдущим блоком — первая пара этого блока
+		if prev is not None:
+			func_arr = np.concatenate(([prev], func_arr))
+			i0 -= 1
+		left = func_arr[:-1]
+		right = func_arr[1:]
+		change = np.flatnonzero(np.signbit(left) != np.signbit(right))
+		change = change[(left[change] != 0) & (right[change] != 0)]
+		idx_parts.append(i0 + change)
+		f_lo_parts.append(left[change])
+		f_hi_parts.append(right[change])
+		prev = func_arr[-1]
+
+	idx = np.concatenate(idx_parts)
+	zero_idx = np.concatenate(zero_parts)
+
+	def points(i):
+		x_arr = i * step + a
+		x_arr[i == n] = b
+		return x_arr
+
+	return (points(idx), points(idx + 1), np.concatenate(f_lo_parts),
+	        np.concatenate(f_hi_parts), points(zero_idx))
+
+# Относительная добавка к точности, как rtol = 4 * eps в brentq: ближе
+# расстояния между соседними float скобку не сузить
+RELATIVE_TOLERANCE = 4 * np.finfo('float64').eps
+
+def bisect_all(func, lo, hi, f_lo, tolerance, max_iter=200):
+	"""
+	    Refines all brackets by bisection (the dichotomy method).
+
+	    A bracket is accepted when its width is below
+	    tolerance + RELATIVE_TOLERANCE * |x|, so a tolerance finer than the
+	    float spacing at the root still converges.
+
+	    Args:
+	        func (callable): Vectorized function.
+	        lo, hi (np.ndarray): Bracket ends, func(lo) and func(hi) of
+	            opposite signs.
+	        f_lo (np.ndarray): func(lo).
+	        tolerance (float): Bracket width at which a root is accepted.
+	        max_iter (int): Iteration limit.
+
+	    Raises:
+	        RuntimeError: If some bracket didn't converge in max_iter.
+
+	    Returns:
+	        np.ndarray: Roots, in the order of brackets.
+	"""
+	lo = np.array(lo, dtype='float64')
+	hi = np.array(hi, dtype='float64')
+	f_lo = np.array(f_lo, dtype='float64')
+	roots = (lo + hi) / 2
+
+	def wide(lo, hi):
+		limit = tolerance + RELATIVE_TOLERANCE * np.maximum(np.abs(lo),
+		                                                    np.abs(hi))
+		return np.abs(hi - lo) > limit
+
+	active = np.flatnonzero(wide(lo, hi))
+	for _ in range(max_iter):
+		if len(active) == 0:
+			return roots
+		mid = (lo[active] + hi[active]) / 2
+		f_mid = func(mid)
+		hit = f_mid == 0
+		same = np.signbit(f_mid) == np.signbit(f_lo[active])
+		lo[active] = np.where(same, mid, lo[active])
+		f_lo[active] = np.where(same, f_mid, f_lo[active])
+		hi[active] = np.where(same, hi[active], mid)
+		roots[active] = np.where(hit, mid, (lo[active] + hi[active]) / 2)
+		active = active[~hit & wide(lo[active], hi[active])]
+	if len(active) == 0:
+		return roots
+	raise RuntimeError('Bisection did not converge.')
+
+def brent_all(func, lo, hi, f_lo, f_hi, tolerance, max_iter=100):
+	"""
+	    Refines all brackets by Brent's method: inverse quadratic or
+	    secant steps while they shrink the bracket fast enough, bisection
+	    otherwise. Converges superlinearly for smooth functions and is
+	    never slower than bisection.
+
+	    Every branch of the classic algorithm is taken per bracket with
+	    np.where, so one iteration is one call of func on all active
+	    brackets. As in brentq, the accuracy of a root x is
+	    tolerance + RELATIVE_TOLERANCE * |x|.
+
+	    Args:
+	        func (callable): Vectorized function.
+	        lo, hi (np.ndarray): Bracket ends.
+	        f_lo, f_hi (np.ndarray): func at the bracket ends, of opposite
+	            signs.
+	        tolerance (float): Absolute accuracy of roots.
+	        max_iter (int): Iteration limit.
+
+	    Raises:
+	        RuntimeError: If some bracket didn't converge in max_iter.
+
+	    Returns:
+	        np.ndarray: Roots, in the order of brackets.
+	"""
+	# Обозначения как в brentq: cur — лучшее приближение, blk — другой
+	# конец скобки, pre — предыдущее приближение; s — длины шагов
+	x_pre = np.array(lo, dtype='float64')
+	x_cur = np.array(hi, dtype='float64')
+	f_pre = np.array(f_lo, dtype='float64')
+	f_cur = np.array(f_hi, dtype='float64')
+	x_blk = np.zeros_like(x_cur)
+	f_blk = np.zeros_like(x_cur)
+	s_pre = np.zeros_like(x_cur)
+	s_cur = np.zeros_like(x_cur)
+	roots = np.empty_like(x_cur)
+	active = np.arange(len(x_cur))
+
+	with np.errstate(divide='ignore', invalid='ignore'):
+		for _ in range(max_iter):
+			# Новый противоположный конец, если знак сменился
+			flip = (f_pre != 0) & (f_cur != 0) & \
+				(np.signbit(f_pre) != np.signbit(f_cur))
+			x_blk = np.where(flip, x_pre, x_blk)
+			f_blk = np.where(flip, f_pre, f_blk)
+			s_pre = np.where(flip, x_cur - x_pre, s_pre)
+			s_cur = np.where(flip, x_cur - x_pre, s_cur)
+
+			# Лучшим приближением делаем конец с меньшим |f|
+			swap = np.abs(f_blk) < np.abs(f_cur)
+			x_pre = np.where(swap, x_cur, x_pre)
+			f_pre = np.where(swap, f_cur, f_pre)
+			x_cur, x_blk = np.where(swap, x_blk, x_cur), \
+				np.where(swap, x_cur, x_blk)
+			f_cur, f_blk = np.where(swap, f_blk, f_cur), \
+				np.where(swap, f_cur, f_blk)
+
+			delta = (tolerance + RELATIVE_TOLERANCE * np.abs(x_cur)) / 2
+			s_bis = (x_blk - x_cur) / 2
+			done = (f_cur == 0) | (np.abs(s_bis) < delta)
+			roots[active[done]] = x_cur[done]
+			if np.all(done):
+				return roots
+
+			keep = ~done
+			active = active[keep]
+			x_pre, x_cur, x_blk = x_pre[keep], x_cur[keep], x_blk[keep]
+			f_pre, f_cur, f_blk = f_pre[keep], f_cur[keep], f_blk[keep]
+			s_pre, s_cur, s_bis = s_pre[keep], s_cur[keep], s_bis[keep]
+			delta = delta[keep]
+
+			secant = -f_cur * (x_cur - x_pre) / (f_cur - f_pre)
+			d_pre = (f_pre - f_cur) / (x_pre - x_cur)
+			d_blk = (f_blk - f_cur) / (x_blk - x_cur)
+			quadratic = -f_cur * (f_blk * d_blk - f_pre * d_pre) / \
+				(d_blk * d_pre * (f_blk - f_pre))
+			s_try = np.where(x_pre == x_blk, secant, quadratic)
+
+			interpolate = (np.abs(s_pre) > delta) & \
+				(np.abs(f_cur) < np.abs(f_pre))
+			good = interpolate & np.isfinite(s_try) & \
+				(2 * np.abs(s_try) < np.minimum(np.abs(s_pre),
+				                                3 * np.abs(s_bis) - delta))
+			s_pre = np.where(good, s_cur, s_bis)
+			s_cur = np.where(good, s_try, s_bis)
+
+			x_pre = x_cur
+			f_pre = f_cur
+			x_cur = x_cur + np.where(np.abs(s_cur) > delta, s_cur,
+			                         np.where(s_bis > 0, delta, -delta))
+			f_cur = np.asarray(func(x_cur), dtype='float64')
+
+	raise RuntimeError("Brent's method did not converge.")
+
+METHODS = {
+	'bisection': bisect_all,
+	'brent': brent_all,
+}
+
+def find_roots(func, a, b, n, tolerance, method='brent',
+               block_size=BLOCK_SIZE, workers=1):
+	"""
+	    Finds all roots of func on [a, b] that are separated by at least
+	    one grid step.
+
+	    Notes:
+	        - Roots of even multiplicity (no sign change) are found only if
+	          func is exactly zero at a grid point.
+	        - A sign change across a pole is not a root; such brackets
+	          are dropped when |func| at the refined point is larger than
+	          at both ends of the bracket.
+
+	    Args:
+	        func (callable): Vectorized function.
+	        a (float): Left end of the interval.
+	        b (float): Right end of the interval.
+	        n (int): Number of grid subintervals for the sign scan.
+	        tolerance (float): Absolute accuracy of roots.
+	        method (str): 'brent' or 'bisection'.
+	        block_size (int or None): Points evaluated at once while scanning.
+	        workers (int): Threads evaluating blocks in parallel.
+
+	    Raises:
+	        ValueError: If the method is unknown.
+
+	    Returns:
+	        np.ndarray: Sorted roots.
+	"""
+	a, b, n = validate_input(a, b, n)
+	tolerance = validate_tolerance(tolerance)
+	if method not in METHODS:
+		raise ValueError(f'Unknown root finding method: {method}')
+
+	lo, hi, f_lo, f_hi, zeros = scan_brackets(func, a, b, n, block_size,
+	                                          workers)
+	if len(lo) == 0:
+		return zeros
+	if method == 'bisection':
+		found = bisect_all(func, lo, hi, f_lo, tolerance)
+	else:
+		found = brent_all(func, lo, hi, f_lo, f_hi, tolerance)
+
+	pole = np.abs(func(found)) > np.maximum(np.abs(f_lo), np.abs(f_hi))
+	return np.sort(np.concatenate((found[~pole], zeros)))